@@ -1,5 +1,21 @@
+import importlib
+import io
+import os
+import re
+import threading
+import uuid
+
 import streamlit as st
-import pandas as pd
+
+import perf
+from cgpa_batch import detect_format
+from cohort import CohortStats
+from gpa_engine import Course, GPAResults, RunningTotals, SemesterCache
+from grading import SCALES, get_scale
+from history import History
+from planner import grade_combinations, plan_for_target
+from storage import TranscriptStore
+from workspace import Workspace
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -11,158 +27,944 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
-    <style>
-    /* Prevent scrolling issues */
-    .stDataEditor {
-        position: relative !important;
-    }
-    
-    /* Smooth transitions */
-    * {
-        transition: none !important;
-    }
+# ============================================================================
+# LAZY IMPORTS - pandas (~0.4 s) loads on first use, or in the background once
+# the first page is out, so pages without tables never wait for it
+# ============================================================================
+
+def lazy_pandas():
+    import pandas
+    return pandas
+
+@st.cache_resource
+def preload_pandas():
+    """Warm the pandas import on a daemon thread, once per process"""
+    thread = threading.Thread(
+        target=importlib.import_module, args=("pandas",), name="cgpa-preload-pandas", daemon=True
+    )
+    thread.start()
+    return thread
+
+# ============================================================================
+# INSTRUMENTATION - opt-in per-rerun timings (?perf=1 or CGPA_PERF=1)
+# ============================================================================
+
+@st.cache_resource
+def get_perf_recorder():
+    return perf.PerfRecorder()
+
+def finish_run(timer):
+    """Record a finished full or fragment run (no-op when disabled)"""
+    timer.finish(get_perf_recorder(), st.session_state.get("transcript_id"))
+
+def render_perf_panel():
+    rows = get_perf_recorder().summary()
+    if not rows:
+        st.caption("No finished runs yet")
+        return
+    perf_df = lazy_pandas().DataFrame(rows, columns=["Run", "Section", "p50", "p95", "Samples"])
+    st.caption("Milliseconds per run; 'widgets' rows are counts")
+    st.dataframe(perf_df, use_container_width=True, hide_index=True)
     
-    /* Remove unwanted animations */
-    [data-testid="stMetricContainer"] {
-        animation: none !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+    cache_stats = get_semester_cache().stats()
+    st.caption(
+        f"Semester cache ({'shared' if SHARED_SEMESTER_CACHE else 'per session'}): "
+        f"{cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%}), "
+        f"{cache_stats['expired']} expired, {cache_stats['size']}/{cache_stats['maxsize']} entries, "
+        f"{cache_stats['rows']}/{cache_stats['max_rows']} rows"
+    )
+
+st.session_state.perf_enabled = perf.enabled(st.query_params)
+run_timer = perf.start_run("full", st.session_state.perf_enabled)
+
+# ============================================================================
+# STATIC ASSETS - read from static/ once per process, shared by every session
+# ============================================================================
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+@st.cache_resource
+def load_static_assets():
+    """CSS and footer HTML, ready to emit (restart the server after editing them)"""
+    with open(os.path.join(STATIC_DIR, "app.css"), encoding="utf-8") as f:
+        css = f"<style>\n{f.read()}</style>"
+    with open(os.path.join(STATIC_DIR, "footer.html"), encoding="utf-8") as f:
+        footer = f.read()
+    return {"css": css, "footer": footer}
+
+static_assets = load_static_assets()
+
+# A style-only st.html goes to the event container, so it takes no layout space
+st.html(static_assets["css"])
+
+run_timer.lap("css")
+
+# ============================================================================
+# PERSISTENCE - one SQLite store per server process, shared by all sessions
+# ============================================================================
+
+@st.cache_resource
+def get_store():
+    return TranscriptStore()
+
+def persist(op, **fields):
+    """Append one edit to the transcript's event log (write-behind)"""
+    get_store().append(st.session_state.transcript_id, op, **fields)
+
+# ============================================================================
+# SEMESTER CACHE - per-semester totals memoized by content, shared by sessions
+# ============================================================================
+
+# CGPA_SHARED_CACHE=0 gives each session a private cache instead
+SHARED_SEMESTER_CACHE = os.environ.get("CGPA_SHARED_CACHE", "1") not in ("", "0")
+
+@st.cache_resource
+def shared_semester_cache():
+    return SemesterCache()
+
+def get_semester_cache():
+    if SHARED_SEMESTER_CACHE:
+        return shared_semester_cache()
+    if "semester_cache" not in st.session_state:
+        st.session_state.semester_cache = SemesterCache()
+    return st.session_state.semester_cache
+
+# ============================================================================
+# STABLE IDS - widget keys that survive inserts and deletes
+# ============================================================================
+
+def new_id():
+    return uuid.uuid4().hex[:12]
+
+def sync_ids(replaced=()):
+    """Match the id maps to semesters_data; rows in `replaced` semesters get new ids.
+
+    Courses are only appended or deleted by index (deletes pop their id
+    directly), so a semester with more rows than ids gets new ids at the end.
+    """
+    semesters_data = st.session_state.semesters_data
+    semester_ids = st.session_state.semester_ids
+    course_ids = st.session_state.course_ids
+    for sem_name in list(semester_ids):
+        if sem_name not in semesters_data:
+            del semester_ids[sem_name]
+            course_ids.pop(sem_name, None)
+    for sem_name, courses_list in semesters_data.items():
+        if sem_name not in semester_ids:
+            semester_ids[sem_name] = new_id()
+        if sem_name in replaced or sem_name not in course_ids:
+            course_ids[sem_name] = []
+        ids = course_ids[sem_name]
+        ids.extend(new_id() for _ in range(len(courses_list) - len(ids)))
 
 # ============================================================================
 # SESSION STATE INITIALIZATION - CRITICAL
 # ============================================================================
+
+# The transcript id lives in the URL so a browser refresh restores the data
+if "transcript_id" not in st.session_state:
+    transcript_id = st.query_params.get("sid")
+    if not transcript_id:
+        transcript_id = uuid.uuid4().hex
+        st.query_params["sid"] = transcript_id
+    st.session_state.transcript_id = transcript_id
+    st.session_state.semesters_data = get_store().load(transcript_id)
+    # Lookups only drop the expired entries they hit; new sessions sweep the rest
+    get_semester_cache().purge_expired()
+
 if "semesters_data" not in st.session_state:
     st.session_state.semesters_data = {}
 
+# Grading scale: in the URL next to the transcript id, so a refresh keeps it
+if "grading_scale" not in st.session_state:
+    st.session_state.grading_scale = get_scale(st.query_params.get("scale")).key
+
+if "semester_totals" not in st.session_state:
+    st.session_state.semester_totals = RunningTotals.from_semesters(
+        st.session_state.semesters_data, cache=get_semester_cache()
+    )
+
+# Stable ids per semester and per course, parallel to semesters_data
+if "semester_ids" not in st.session_state:
+    st.session_state.semester_ids = {}
+    st.session_state.course_ids = {}
+    sync_ids()
+
+# Undo/redo checkpoints for this session's edits
+if "history" not in st.session_state:
+    st.session_state.history = History()
+
+# Grid mode: bumped per semester after each applied edit to reset the editor
+if "grid_versions" not in st.session_state:
+    st.session_state.grid_versions = {}
+
+# Compact view: the one semester that builds its input widgets
+if "expanded_semester" not in st.session_state:
+    st.session_state.expanded_semester = None
+
+# Cohort analytics: CohortStats for an uploaded cohort file, if any
+if "cohort" not in st.session_state:
+    st.session_state.cohort = None
+
+# Advisor workspace: the student index behind ?ws=, once the first student is added
+if "workspace" not in st.session_state:
+    workspace_id = st.query_params.get("ws")
+    st.session_state.workspace = Workspace(get_store(), workspace_id) if workspace_id else None
+
+run_timer.lap("session_state")
+
 # ============================================================================
 # CALCULATION FUNCTIONS
 # ============================================================================
 
+def current_scale():
+    return get_scale(st.session_state.grading_scale)
+
 def calculate_gpa(courses_list):
     """Calculate GPA: Σ(Credit Hours × Grade Points) / Σ(Credit Hours)"""
     if not courses_list or not isinstance(courses_list, list):
         return 0.0
+    return get_semester_cache().totals(courses_list).gpa(current_scale().max_points)
+
+def calculate_cgpa(semesters_data):
+    """Calculate CGPA: weighted average of all courses"""
+    if not isinstance(semesters_data, dict) or not semesters_data:
+        return 0.0
+    # Same per-semester totals as calculate_gpa, so the two always agree
+    totals = RunningTotals.from_semesters(semesters_data, cache=get_semester_cache())
+    return totals.cgpa(current_scale().max_points)
+
+def get_total_courses():
+    """Get total number of valid courses"""
+    return st.session_state.semester_totals.overall.courses
+
+def get_total_credits():
+    """Get total credits across all semesters"""
+    return round(st.session_state.semester_totals.overall.listed_credits, 1)
+
+# ============================================================================
+# STATE MUTATIONS - every edit goes through here so totals stay in step
+# ============================================================================
+
+GRID_COLUMNS = ["Course Name", "Credit Hours", "Grade Points"]
+GRID_FIELDS = dict(zip(GRID_COLUMNS, Course._fields))
+
+def blank_course():
+    return Course("", 0.0, 0.0)
+
+def checkpoint(label, *touched):
+    """Save the semesters a mutation is about to change (none given = all)"""
+    st.session_state.history.record(
+        label,
+        st.session_state.semesters_data,
+        st.session_state.semester_totals,
+        touched or None
+    )
+
+def step_history(redo=False):
+    """Undo/redo callback: restore data and totals, then reset every editor"""
+    history = st.session_state.history
+    step = history.redo if redo else history.undo
+    restored = step(st.session_state.semesters_data, st.session_state.semester_totals)
+    if restored is None:
+        st.session_state.history_message = "Nothing to redo" if redo else "Nothing to undo"
+        return
+    st.session_state.history_message = f"{'Redid' if redo else 'Undid'}: {restored.label}"
+    if st.session_state.expanded_semester not in st.session_state.semesters_data:
+        st.session_state.expanded_semester = None
+    # Restored rows get new ids, so no widget keeps the value it had before
+    sync_ids(replaced=restored.semesters)
+    for sem_name in restored.semesters:
+        st.session_state.grid_versions[sem_name] = st.session_state.grid_versions.get(sem_name, 0) + 1
+    semesters_data = st.session_state.semesters_data
+    persist(
+        "restore",
+        order=list(semesters_data),
+        semesters={sem_name: semesters_data[sem_name] for sem_name in restored.semesters}
+    )
+
+def add_semester():
+    semester_num = len(st.session_state.semesters_data) + 1
+    # After a delete the next number can still be taken ("Semester 3" of 2)
+    while f"Semester {semester_num}" in st.session_state.semesters_data:
+        semester_num += 1
+    sem_name = f"Semester {semester_num}"
+    checkpoint(f"add {sem_name}", sem_name)
+    courses_list = [blank_course()]
+    st.session_state.semesters_data[sem_name] = courses_list
+    st.session_state.semester_totals.add_semester(sem_name, courses_list)
+    sync_ids()
+    st.session_state.expanded_semester = sem_name
+    persist("set_semester", semester=sem_name, courses=courses_list)
+
+def delete_semester(sem_name):
+    checkpoint(f"delete {sem_name}", sem_name)
+    del st.session_state.semesters_data[sem_name]
+    st.session_state.semester_totals.remove_semester(sem_name)
+    if st.session_state.expanded_semester == sem_name:
+        st.session_state.expanded_semester = None
+    sync_ids()
+    persist("delete_semester", semester=sem_name)
+
+def reset_all():
+    checkpoint("reset all")
+    st.session_state.semesters_data = {}
+    st.session_state.semester_totals = RunningTotals()
+    st.session_state.expanded_semester = None
+    sync_ids()
+    persist("reset")
+
+# Everything that belongs to the open student; switching swaps these as a set
+STUDENT_STATE_KEYS = (
+    "transcript_id", "semesters_data", "semester_totals", "semester_ids", "course_ids",
+    "history", "grid_versions", "expanded_semester"
+)
+
+def student_state(transcript_id, semesters_data):
+    """Fresh session state for a transcript that isn't in the working set"""
+    return {
+        "transcript_id": transcript_id,
+        "semesters_data": semesters_data,
+        "semester_totals": RunningTotals.from_semesters(semesters_data, cache=get_semester_cache()),
+        "semester_ids": {},
+        "course_ids": {},
+        "history": History(),
+        "grid_versions": {},
+        "expanded_semester": None,
+    }
+
+def switch_student(transcript_id):
+    workspace = st.session_state.workspace
+    if transcript_id == st.session_state.transcript_id:
+        return
+    workspace.stash(
+        st.session_state.transcript_id,
+        {key: st.session_state[key] for key in STUDENT_STATE_KEYS}
+    )
+    st.session_state.update(workspace.open(transcript_id, student_state))
+    sync_ids()
+    st.query_params["sid"] = transcript_id
+
+def on_student_pick():
+    switch_student(st.session_state.student_picker)
+
+def add_student():
+    """Start a transcript for a new student; the first add creates the workspace"""
+    workspace = st.session_state.workspace
+    if workspace is None:
+        workspace = st.session_state.workspace = Workspace(get_store(), uuid.uuid4().hex)
+        st.query_params["ws"] = workspace.workspace_id
+    # The transcript on screen joins the workspace rather than being left behind
+    if st.session_state.transcript_id not in workspace:
+        workspace.add(f"Student {len(workspace) + 1}", st.session_state.transcript_id)
+    name = st.session_state.new_student_name.strip() or f"Student {len(workspace) + 1}"
+    st.session_state.new_student_name = ""
+    switch_student(workspace.add(name).transcript_id)
+
+def rename_student(transcript_id, widget_key):
+    name = st.session_state[widget_key].strip()
+    if name:
+        st.session_state.workspace.rename(transcript_id, name)
+
+def import_courses(uploaded_file, progress=None):
+    """Append an uploaded CSV/Excel transcript; returns ImportStats.
+
+    The file is read into a dict of its own first, so one that fails part
+    way through leaves the transcript, its totals and its log untouched.
+    """
+    from transcript_import import import_transcript  # pandas-based: load on first import
     
-    total_credits = 0.0
-    total_points = 0.0
+    kind = "xlsx" if uploaded_file.name.lower().endswith(".xlsx") else "csv"
+    imported, stats = import_transcript(uploaded_file, kind, progress=progress, scale=current_scale())
+    if not imported:
+        return stats
     
-    for course in courses_list:
-        if not isinstance(course, dict):
+    checkpoint(f"import {uploaded_file.name}", *imported)
+    semesters_data = st.session_state.semesters_data
+    for sem_name, courses_list in imported.items():
+        semesters_data.setdefault(sem_name, []).extend(courses_list)
+        st.session_state.semester_totals.set_semester_totals(
+            sem_name, get_semester_cache().totals(semesters_data[sem_name]).as_delta()
+        )
+        # Grid editors hold a diff against the old rows: start them fresh
+        st.session_state.grid_versions[sem_name] = st.session_state.grid_versions.get(sem_name, 0) + 1
+    sync_ids()
+    # Log only the appended rows, one event per semester that received any
+    for sem_name, courses_list in imported.items():
+        persist("add_courses", semester=sem_name, courses=courses_list)
+    return stats
+
+def load_cohort(uploaded_file):
+    """Replace the session's cohort with the uploaded CSV/JSONL file's"""
+    lines = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    try:
+        st.session_state.cohort = CohortStats.from_file(
+            lines, detect_format(uploaded_file.name, None), current_scale().max_points
+        )
+    finally:
+        # Don't let the wrapper close the uploaded file when it's collected
+        lines.detach()
+    return st.session_state.cohort
+
+def on_scale_change():
+    """Keep the scale in the URL and rebuild inputs whose limits just changed"""
+    st.query_params["scale"] = st.session_state.grading_scale
+    for sem_name in st.session_state.semesters_data:
+        st.session_state.grid_versions[sem_name] = st.session_state.grid_versions.get(sem_name, 0) + 1
+    # The old target may be above the new scale's maximum
+    st.session_state.pop("planner_target", None)
+    # Cohort CGPAs were clamped and binned on the old scale
+    st.session_state.cohort = None
+
+def grid_row_to_course(row, base_course=None):
+    """Merge data_editor cell values into a Course (empty cells -> blank)"""
+    course = base_course or blank_course()
+    for column, value in row.items():
+        field = GRID_FIELDS.get(column)
+        if field is None:
             continue
+        if value is None:
+            value = "" if field == "name" else 0.0
+        course = course.with_value(field, value)
+    return course
+
+def on_grid_edit(sem_name, widget_key):
+    """data_editor callback: apply the batched diff as totals deltas"""
+    diff = st.session_state[widget_key]
+    checkpoint(f"edit {sem_name}", sem_name)
+    courses_list = st.session_state.semesters_data[sem_name]
+    course_ids = st.session_state.course_ids[sem_name]
+    totals = st.session_state.semester_totals
+    
+    for row_idx, changes in diff.get("edited_rows", {}).items():
+        row_idx = int(row_idx)
+        old_course = courses_list[row_idx]
+        new_course = grid_row_to_course(changes, old_course)
+        courses_list[row_idx] = new_course
+        totals.update_course(sem_name, old_course, new_course)
+    
+    for row_idx in sorted(diff.get("deleted_rows", []), reverse=True):
+        old_course = courses_list.pop(row_idx)
+        course_ids.pop(row_idx)
+        totals.update_course(sem_name, old_course, None)
+    
+    for row in diff.get("added_rows", []):
+        new_course = grid_row_to_course(row)
+        courses_list.append(new_course)
+        course_ids.append(new_id())
+        totals.update_course(sem_name, None, new_course)
+    
+    # The editor's pending diff is now part of semesters_data: start fresh
+    st.session_state.grid_versions[sem_name] = st.session_state.grid_versions.get(sem_name, 0) + 1
+    persist("set_semester", semester=sem_name, courses=courses_list)
+
+def expand_semester(sem_name):
+    st.session_state.expanded_semester = sem_name
+
+def add_course(sem_name):
+    checkpoint(f"add course to {sem_name}", sem_name)
+    course = blank_course()
+    st.session_state.semesters_data[sem_name].append(course)
+    st.session_state.course_ids[sem_name].append(new_id())
+    st.session_state.semester_totals.update_course(sem_name, None, course)
+    persist("add_courses", semester=sem_name, courses=[course])
+
+def delete_course(sem_name, course_id):
+    checkpoint(f"delete course from {sem_name}", sem_name)
+    course_ids = st.session_state.course_ids[sem_name]
+    course_idx = course_ids.index(course_id)
+    course_ids.pop(course_idx)
+    course = st.session_state.semesters_data[sem_name].pop(course_idx)
+    st.session_state.semester_totals.update_course(sem_name, course, None)
+    persist("delete_course", semester=sem_name, index=course_idx)
+
+def on_course_edit(sem_name, course_id, field, widget_key):
+    """Widget callback: apply one edited field as an O(1) totals delta"""
+    checkpoint(f"edit course in {sem_name}", sem_name)
+    course_idx = st.session_state.course_ids[sem_name].index(course_id)
+    courses_list = st.session_state.semesters_data[sem_name]
+    old_course = courses_list[course_idx]
+    new_course = old_course.with_value(field, st.session_state[widget_key])
+    courses_list[course_idx] = new_course
+    st.session_state.semester_totals.update_course(sem_name, old_course, new_course)
+    persist("edit_course", semester=sem_name, index=course_idx, course=new_course)
+
+# ============================================================================
+# AGGREGATION - one pass per rerun, shared by every display section
+# ============================================================================
+
+def aggregate_results():
+    """Build the GPAResults every section below reads from"""
+    return GPAResults.from_totals(
+        st.session_state.semesters_data,
+        st.session_state.semester_totals,
+        current_scale().max_points
+    )
+
+results = aggregate_results()
+run_timer.lap("aggregation")
+
+# Fragment reruns skip this top-level script, so the flag stays True between
+# the end of a full run and the next one
+st.session_state.full_run_complete = False
+
+# ============================================================================
+# AGGREGATE DISPLAYS - drawn into placeholders so fragments can redraw them
+# ============================================================================
+
+def render_quick_stats(results):
+    st.metric("📊 CGPA", f"{results.cgpa:.2f}")
+    st.metric("📅 Semesters", results.semester_count)
+    st.metric("📖 Courses", results.total_courses)
+    st.metric("🎓 Credits", results.total_credits)
+
+def render_overview(results):
+    # Top metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("CGPA", f"{results.cgpa:.2f}")
+    with col2:
+        st.metric("Semesters", results.semester_count)
+    with col3:
+        st.metric("Courses", results.total_courses)
+    with col4:
+        st.metric("Credits", results.total_credits)
+    
+    st.divider()
+    
+    # Progress bar
+    st.subheader("Progress")
+    max_points = current_scale().max_points
+    progress_pct = min(results.cgpa / max_points, 1.0)
+    st.progress(progress_pct, text=f"{results.cgpa:.2f} / {max_points:g}")
+
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~])")
+
+def render_summary(results):
+    # A markdown table: a few rows don't need a pandas/Arrow round trip
+    if not results.semesters:
+        return
+    lines = ["| Semester | Courses | Credits | GPA |", "| :-- | --: | --: | --: |"]
+    for sem_stats in results.semesters.values():
+        sem_label = MARKDOWN_SPECIAL.sub(r"\\\1", sem_stats.name)
+        lines.append(f"| {sem_label} | {sem_stats.courses} | {sem_stats.credits:.1f} | {sem_stats.gpa:.2f} |")
+    st.markdown("\n".join(lines))
+
+PLANNER_COLUMNS = ["Course", "Credit Hours"]
+
+@st.cache_resource
+def default_planned_courses():
+    """Starting rows for the planner's editor (data_editor never mutates them)"""
+    return lazy_pandas().DataFrame(
+        [(f"Planned {i + 1}", 3.0) for i in range(5)], columns=PLANNER_COLUMNS
+    )
+
+def render_planner(results):
+    """Required GPA and grade combinations for the planner inputs above"""
+    scale = current_scale()
+    overall = st.session_state.semester_totals.overall
+    target = st.session_state.planner_target
+    next_credits = st.session_state.planner_credits
+    
+    plan = plan_for_target(overall.credits, overall.points, next_credits, target, scale.max_points)
+    if plan.required_gpa <= 0:
+        st.success(f"Your CGPA stays at or above {target:.2f} whatever you earn next semester")
+    elif plan.feasible:
+        st.info(f"You need a GPA of **{plan.required_gpa:.2f}** over {next_credits:g} credits to reach {target:.2f}")
+    else:
+        st.warning(
+            f"{target:.2f} is out of reach next semester: "
+            f"straight {scale.max_points:g}s give a CGPA of {plan.best_cgpa:.2f}"
+        )
+    
+    if not st.session_state.get("planner_by_course"):
+        return
+    pd = lazy_pandas()
+    planned = [
+        (str(name).strip() or f"Course {idx + 1}", float(credit_hours))
+        for idx, (name, credit_hours) in enumerate(st.session_state.planned_courses.itertuples(index=False))
+        if pd.notna(credit_hours) and credit_hours > 0
+    ]
+    if not planned:
+        return
+    if not scale.levels:
+        st.caption("Grade combinations need a letter-grade scale")
+        return
+    combinations, truncated = grade_combinations(
+        overall.credits, overall.points, [credit_hours for _, credit_hours in planned], target,
+        scale.levels, max_points=scale.max_points
+    )
+    if not combinations:
+        st.caption("No grade combination for the planned courses reaches the target")
+        return
+    combos_df = pd.DataFrame(
+        [
+            [level.letter for level in combo.grades] + [f"{combo.term_gpa:.2f}", f"{combo.cgpa:.2f}"]
+            for combo in combinations
+        ],
+        columns=[name for name, _ in planned] + ["Term GPA", "CGPA"]
+    )
+    st.caption("Lowest grades that still reach the target (lowering any one course would miss it)")
+    st.dataframe(combos_df, use_container_width=True, hide_index=True)
+    if truncated:
+        st.caption(f"Showing the first {len(combinations)} combinations, most even first")
+
+def render_cohort(results):
+    cohort = st.session_state.cohort
+    position = cohort.position(results.cgpa)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Cohort size", len(cohort))
+    with col2:
+        st.metric("Your rank", f"#{position.rank}")
+    with col3:
+        st.metric("Percentile", f"{position.percentile:.1f}%")
+    with col4:
+        st.metric("Cohort median", f"{cohort.quantile(0.5):.2f}")
+    
+    # Pre-binned counts: chart size doesn't grow with the cohort
+    histogram = cohort.histogram()
+    pd = lazy_pandas()
+    histogram_df = pd.DataFrame(
+        {"Students": [count for _, count in histogram]},
+        index=pd.Index([label for label, _ in histogram], name="CGPA")
+    )
+    st.bar_chart(histogram_df)
+
+def draw_aggregates(aggregate_slots, results, timer=perf.NULL_TIMER):
+    """Replace the content of each (placeholder, render) slot"""
+    for slot, render in aggregate_slots:
+        with timer.section(f"aggregates/{render.__name__}"), slot.container():
+            render(results)
+
+# ============================================================================
+# COURSE EDITORS - row mode (default) and opt-in grid mode
+# ============================================================================
+
+def course_rows(sem_id, sem_name, courses_list):
+    """Row mode: one text/number input per field plus a delete button"""
+    # Header row
+    header_col1, header_col2, header_col3 = st.columns([3, 1.5, 1.5])
+    with header_col1:
+        st.write("**Course Name**")
+    with header_col2:
+        st.write("**Credit Hours**")
+    with header_col3:
+        st.write("**Grade Points**")
+    
+    scale = current_scale()
+    
+    # Input rows - manual columns instead of data_editor
+    for course_id, course in zip(st.session_state.course_ids[sem_name], courses_list):
+        name_key = f"course_name_{course_id}"
+        credit_key = f"credit_hours_{course_id}"
+        grade_key = f"grade_points_{course_id}"
+        input_col1, input_col2, input_col3, del_col = st.columns([3, 1.5, 1.5, 0.5])
         
-        course_name = str(course.get("Course Name", "")).strip()
-        if not course_name:
-            continue
+        with input_col1:
+            st.text_input(
+                "Course",
+                value=course.name,
+                label_visibility="collapsed",
+                key=name_key,
+                on_change=on_course_edit,
+                args=(sem_name, course_id, "name", name_key)
+            )
         
-        try:
-            credit_hours = float(course.get("Credit Hours") or 0)
-            grade_points = float(course.get("Grade Points") or 0)
-            
-            if credit_hours > 0:
-                total_credits += credit_hours
-                total_points += credit_hours * grade_points
-        except (ValueError, TypeError):
-            continue
-    
-    if total_credits == 0:
-        return 0.0
+        with input_col2:
+            st.number_input(
+                "Credit",
+                value=course.credit_hours or 0.0,
+                min_value=0.0,
+                max_value=10.0,
+                step=0.5,
+                label_visibility="collapsed",
+                key=credit_key,
+                on_change=on_course_edit,
+                args=(sem_name, course_id, "credit_hours", credit_key)
+            )
+        
+        with input_col3:
+            grade_points = course.grade_points or 0.0
+            # A grade saved under a larger scale stays visible rather than failing the widget
+            st.number_input(
+                "Grade",
+                value=grade_points,
+                min_value=0.0,
+                max_value=max(scale.max_points, grade_points),
+                step=scale.step,
+                label_visibility="collapsed",
+                key=grade_key,
+                on_change=on_course_edit,
+                args=(sem_name, course_id, "grade_points", grade_key)
+            )
+        
+        with del_col:
+            st.button(
+                "❌",
+                key=f"del_course_{course_id}",
+                help="Delete course",
+                on_click=delete_course,
+                args=(sem_name, course_id)
+            )
     
-    gpa = total_points / total_credits
-    return round(max(0.0, min(gpa, 4.0)), 2)
+    # Add row button
+    col_add, col_empty = st.columns([1, 4])
+    with col_add:
+        st.button(
+            "➕ Add Course",
+            key=f"add_course_{sem_id}",
+            on_click=add_course,
+            args=(sem_name,)
+        )
 
-def calculate_cgpa(semesters_data):
-    """Calculate CGPA: weighted average of all courses"""
-    if not isinstance(semesters_data, dict) or not semesters_data:
-        return 0.0
+def course_grid(sem_id, sem_name, courses_list):
+    """Grid mode: the whole semester in one data_editor, applied as a diff"""
+    grid_key = f"grid_{sem_id}_{st.session_state.grid_versions.get(sem_name, 0)}"
+    scale = current_scale()
+    st.data_editor(
+        lazy_pandas().DataFrame(courses_list, columns=GRID_COLUMNS),
+        key=grid_key,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Course Name": st.column_config.TextColumn("Course Name", default=""),
+            "Credit Hours": st.column_config.NumberColumn(
+                "Credit Hours", min_value=0.0, max_value=10.0, step=0.5, default=0.0
+            ),
+            "Grade Points": st.column_config.NumberColumn(
+                "Grade Points", min_value=0.0, max_value=scale.max_points, step=scale.step, default=0.0
+            ),
+        },
+        on_change=on_grid_edit,
+        args=(sem_name, grid_key)
+    )
+
+# ============================================================================
+# SEMESTER FRAGMENT - editing one semester reruns only this block
+# ============================================================================
+
+@st.fragment
+def semester_section(sem_name, aggregate_slots):
+    if sem_name not in st.session_state.semesters_data:
+        return
+    sem_id = st.session_state.semester_ids[sem_name]
     
-    total_credits = 0.0
-    total_points = 0.0
+    # A fragment-only rerun is a run of its own; in a full run the time is
+    # part of the page's "semesters" lap
+    fragment_rerun = st.session_state.full_run_complete
+    if fragment_rerun:
+        timer = perf.start_run("fragment", st.session_state.perf_enabled)
+    else:
+        timer = perf.NULL_TIMER
     
-    for sem_name, courses_list in semesters_data.items():
-        if not isinstance(courses_list, list):
-            continue
+    with st.container(border=True):
+        col_title, col_delete = st.columns([4, 1])
         
-        for course in courses_list:
-            if not isinstance(course, dict):
-                continue
-            
-            course_name = str(course.get("Course Name", "")).strip()
-            if not course_name:
-                continue
-            
-            try:
-                credit_hours = float(course.get("Credit Hours") or 0)
-                grade_points = float(course.get("Grade Points") or 0)
-                
-                if credit_hours > 0:
-                    total_credits += credit_hours
-                    total_points += credit_hours * grade_points
-            except (ValueError, TypeError):
-                continue
-    
-    if total_credits == 0:
-        return 0.0
+        with col_title:
+            st.subheader(f"{sem_name}")
+        
+        with col_delete:
+            # Removing a semester changes the page layout: full rerun
+            if st.button("🗑️ Delete", key=f"del_{sem_id}"):
+                delete_semester(sem_name)
+                st.rerun()
+        
+        # Get current courses for this semester
+        courses_list = st.session_state.semesters_data[sem_name]
+        
+        if st.session_state.get("grid_mode"):
+            course_grid(sem_id, sem_name, courses_list)
+        else:
+            course_rows(sem_id, sem_name, courses_list)
+        timer.lap("widgets")
+        
+        # On a fragment-only rerun the page-level results are stale:
+        # re-aggregate from the running totals and redraw the aggregate slots.
+        # During a full run, only claim the slots so the fragment owns a
+        # stable position in them; the page draws their content afterwards.
+        if fragment_rerun:
+            page_results = aggregate_results()
+            timer.lap("aggregation")
+            draw_aggregates(aggregate_slots, page_results, timer)
+            timer.lap("aggregates")
+        else:
+            for slot, _ in aggregate_slots:
+                slot.empty()
+            page_results = results
+        
+        # Semester stats
+        sem_stats = page_results.semesters[sem_name]
+        
+        st.divider()
+        
+        stat_col1, stat_col2, stat_col3 = st.columns(3)
+        with stat_col1:
+            st.metric("GPA", f"{sem_stats.gpa:.2f}")
+        with stat_col2:
+            st.metric("Courses", sem_stats.courses)
+        with stat_col3:
+            st.metric("Credits", f"{sem_stats.credits:.1f}")
     
-    cgpa = total_points / total_credits
-    return round(max(0.0, min(cgpa, 4.0)), 2)
+    if fragment_rerun:
+        timer.lap("semester_stats")
+        finish_run(timer)
 
-def get_total_courses():
-    """Get total number of valid courses"""
-    count = 0
-    for sem_name, courses_list in st.session_state.semesters_data.items():
-        if not isinstance(courses_list, list):
-            continue
-        for course in courses_list:
-            if isinstance(course, dict) and str(course.get("Course Name", "")).strip():
-                count += 1
-    return count
+# ============================================================================
+# COLLAPSED SEMESTER - one cached summary line, no input widgets
+# ============================================================================
 
-def get_total_credits():
-    """Get total credits across all semesters"""
-    total = 0.0
-    for sem_name, courses_list in st.session_state.semesters_data.items():
-        if not isinstance(courses_list, list):
-            continue
-        for course in courses_list:
-            try:
-                if str(course.get("Course Name", "")).strip():
-                    credit_val = course.get("Credit Hours", 0)
-                    if credit_val is None:
-                        credit_val = 0
-                    total += float(credit_val)
-            except (ValueError, TypeError):
-                pass
-    return round(total, 1)
+def collapsed_semester_row(sem_id, sem_stats):
+    label = (
+        f"▸ {sem_stats.name}  ·  GPA {sem_stats.gpa:.2f}  ·  "
+        f"{sem_stats.courses} courses  ·  {sem_stats.credits:.1f} credits"
+    )
+    st.button(
+        label,
+        key=f"expand_{sem_id}",
+        help="Expand to edit courses",
+        use_container_width=True,
+        on_click=expand_semester,
+        args=(sem_stats.name,)
+    )
 
 # ============================================================================
 # SIDEBAR
 # ============================================================================
 
+aggregate_slots = []
+
 with st.sidebar:
     st.header("⚙️ Controls")
     
     if st.button("➕ Add Semester", use_container_width=True):
-        semester_num = len(st.session_state.semesters_data) + 1
-        st.session_state.semesters_data[f"Semester {semester_num}"] = [
-            {"Course Name": "", "Credit Hours": 0.0, "Grade Points": 0.0}
-        ]
+        add_semester()
         st.rerun()
     
     if st.button("🔄 Reset All", use_container_width=True):
-        st.session_state.semesters_data = {}
+        reset_all()
         st.rerun()
     
+    # Callbacks run before the next full rerun redraws every semester
+    undo_col, redo_col = st.columns(2)
+    with undo_col:
+        st.button("↩️ Undo", use_container_width=True, on_click=step_history)
+    with redo_col:
+        st.button("↪️ Redo", use_container_width=True, on_click=step_history, kwargs={"redo": True})
+    if "history_message" in st.session_state:
+        st.toast(st.session_state.pop("history_message"))
+    
+    st.toggle(
+        "▦ Grid mode",
+        key="grid_mode",
+        help="Edit each semester in one table instead of per-course inputs"
+    )
+    
+    compact_view = st.toggle(
+        "🗂️ Compact view",
+        key="compact_view",
+        help="Collapse semesters to one line; only the expanded one shows inputs"
+    )
+    
+    st.selectbox(
+        "🎓 Grading scale",
+        options=list(SCALES),
+        format_func=lambda key: SCALES[key].label,
+        key="grading_scale",
+        on_change=on_scale_change,
+        help="Grade points are entered on this scale; imports also accept its letters and percentages"
+    )
+    
+    with st.expander("🧑‍🎓 Students"):
+        workspace = st.session_state.workspace
+        transcript_id = st.session_state.transcript_id
+        if workspace is not None and transcript_id in workspace:
+            # Follow switches made by callbacks; the picker is drawn after this
+            st.session_state.student_picker = transcript_id
+            st.selectbox(
+                "Open student",
+                options=list(workspace.students),
+                format_func=lambda student_id: workspace.students[student_id].name,
+                key="student_picker",
+                on_change=on_student_pick
+            )
+            name_key = f"student_name_{transcript_id}"
+            st.text_input(
+                "Name",
+                value=workspace.students[transcript_id].name,
+                key=name_key,
+                on_change=rename_student,
+                args=(transcript_id, name_key)
+            )
+            st.caption(f"{len(workspace)} students · {len(workspace.loaded)} open in memory")
+        st.text_input("New student", key="new_student_name", placeholder="Name")
+        st.button("➕ Add student", use_container_width=True, on_click=add_student)
+    
+    with st.expander("📥 Import transcript"):
+        uploaded_file = st.file_uploader(
+            "CSV or Excel file",
+            type=["csv", "xlsx"],
+            help="Columns: Semester, Course Name, Credit Hours, Grade Points (points, letters or 87%)"
+        )
+        if uploaded_file is not None and st.button("Import", use_container_width=True):
+            progress_bar = st.progress(0.0, text="Importing...")
+            try:
+                stats = import_courses(uploaded_file, progress=progress_bar.progress)
+            except (ImportError, ValueError) as exc:
+                st.error(f"Import failed: {exc}")
+            else:
+                st.session_state.import_message = (
+                    f"Imported {stats.imported} courses ({stats.skipped} invalid rows skipped)"
+                )
+                st.rerun()
+        if "import_message" in st.session_state:
+            st.success(st.session_state.pop("import_message"))
+    
+    with st.expander("👥 Cohort analytics"):
+        cohort_file = st.file_uploader(
+            "Cohort file (CSV or JSONL)",
+            type=["csv", "jsonl"],
+            help="Same format as cgpa_batch.py: one row per course with a Student ID column"
+        )
+        if cohort_file is not None and st.button("Load cohort", use_container_width=True):
+            try:
+                cohort = load_cohort(cohort_file)
+            except (ValueError, UnicodeDecodeError) as exc:
+                st.error(f"Could not read cohort: {exc}")
+            else:
+                st.session_state.cohort_message = f"Loaded {len(cohort)} students"
+                st.rerun()
+        if "cohort_message" in st.session_state:
+            st.success(st.session_state.pop("cohort_message"))
+        
+        if st.session_state.cohort is not None:
+            lookup_id = st.text_input("Look up student ID")
+            if lookup_id:
+                member = st.session_state.cohort.student(lookup_id)
+                if member is None:
+                    st.warning(f"{lookup_id} is not in the cohort")
+                else:
+                    st.write(
+                        f"CGPA **{member.cgpa:.2f}** · rank **#{member.rank}** "
+                        f"of {len(st.session_state.cohort)} · **{member.percentile:.1f}%** at or below"
+                    )
+            if st.button("Clear cohort", use_container_width=True):
+                st.session_state.cohort = None
+                st.rerun()
+    
     st.divider()
     
     if st.session_state.semesters_data:
         st.subheader("Quick Stats")
-        cgpa = calculate_cgpa(st.session_state.semesters_data)
-        st.metric("📊 CGPA", f"{cgpa:.2f}")
-        st.metric("📅 Semesters", len(st.session_state.semesters_data))
-        st.metric("📖 Courses", get_total_courses())
-        st.metric("🎓 Credits", get_total_credits())
+        aggregate_slots.append((st.empty(), render_quick_stats))
+    
+    # Hidden unless instrumentation is on; shows the previous runs' numbers
+    if st.session_state.perf_enabled:
+        with st.expander("⏱️ Performance"):
+            render_perf_panel()
+
+run_timer.lap("sidebar")
 
 # ============================================================================
 # MAIN HEADER
@@ -170,7 +972,14 @@ with st.sidebar:
 
 st.title("📚 GPA & CGPA Calculator")
 st.markdown("Manage your academic performance with precision")
+# The writer keeps failed batches and retries them; say so while it can't save
+if get_store().write_error:
+    st.warning(
+        f"⚠️ Changes aren't being saved ({get_store().unsaved} pending): "
+        f"{get_store().write_error}. Retrying in the background - keep this tab open."
+    )
 st.divider()
+run_timer.lap("header")
 
 # ============================================================================
 # MAIN CONTENT
@@ -179,160 +988,88 @@ st.divider()
 if not st.session_state.semesters_data:
     st.info("👈 Click 'Add Semester' to start tracking your GPA")
 else:
-    # Top metrics
-    cgpa = calculate_cgpa(st.session_state.semesters_data)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("CGPA", f"{cgpa:.2f}")
-    with col2:
-        st.metric("Semesters", len(st.session_state.semesters_data))
-    with col3:
-        st.metric("Courses", get_total_courses())
-    with col4:
-        st.metric("Credits", get_total_credits())
-    
-    st.divider()
-    
-    # Progress bar
-    st.subheader("Progress")
-    progress_pct = min(cgpa / 4.0, 1.0)
-    st.progress(progress_pct, text=f"{cgpa:.2f} / 4.0")
+    aggregate_slots.append((st.empty(), render_overview))
     
     st.divider()
     
     # Semesters section - NO TABS TO AVOID SCROLL ISSUES
     st.subheader("Semester Details")
-    
-    sem_names = list(st.session_state.semesters_data.keys())
-    
-    for sem_idx, sem_name in enumerate(sem_names):
-        with st.container(border=True):
-            col_title, col_delete = st.columns([4, 1])
-            
-            with col_title:
-                st.subheader(f"{sem_name}")
-            
-            with col_delete:
-                if st.button("🗑️ Delete", key=f"del_{sem_idx}"):
-                    del st.session_state.semesters_data[sem_name]
-                    st.rerun()
-            
-            # Get current courses for this semester
-            courses_list = st.session_state.semesters_data[sem_name]
-            
-            # Create columns for manual input instead of data_editor
-            courses_input = []
-            
-            # Header row
-            header_col1, header_col2, header_col3 = st.columns([3, 1.5, 1.5])
-            with header_col1:
-                st.write("**Course Name**")
-            with header_col2:
-                st.write("**Credit Hours**")
-            with header_col3:
-                st.write("**Grade Points**")
-            
-            # Input rows
-            for course_idx, course in enumerate(courses_list):
-                input_col1, input_col2, input_col3, del_col = st.columns([3, 1.5, 1.5, 0.5])
-                
-                with input_col1:
-                    course_name = st.text_input(
-                        "Course",
-                        value=course.get("Course Name", ""),
-                        label_visibility="collapsed",
-                        key=f"course_name_{sem_idx}_{course_idx}"
-                    )
-                
-                with input_col2:
-                    credit_hours = st.number_input(
-                        "Credit",
-                        value=float(course.get("Credit Hours", 0.0)),
-                        min_value=0.0,
-                        max_value=10.0,
-                        step=0.5,
-                        label_visibility="collapsed",
-                        key=f"credit_hours_{sem_idx}_{course_idx}"
-                    )
-                
-                with input_col3:
-                    grade_points = st.number_input(
-                        "Grade",
-                        value=float(course.get("Grade Points", 0.0)),
-                        min_value=0.0,
-                        max_value=4.0,
-                        step=0.1,
-                        label_visibility="collapsed",
-                        key=f"grade_points_{sem_idx}_{course_idx}"
-                    )
-                
-                with del_col:
-                    if st.button("❌", key=f"del_course_{sem_idx}_{course_idx}", help="Delete course"):
-                        courses_list.pop(course_idx)
-                        st.rerun()
-                
-                courses_input.append({
-                    "Course Name": course_name,
-                    "Credit Hours": credit_hours,
-                    "Grade Points": grade_points
-                })
-            
-            # Update semester data
-            st.session_state.semesters_data[sem_name] = courses_input
-            
-            # Add row button
-            col_add, col_empty = st.columns([1, 4])
-            with col_add:
-                if st.button("➕ Add Course", key=f"add_course_{sem_idx}"):
-                    st.session_state.semesters_data[sem_name].append({
-                        "Course Name": "",
-                        "Credit Hours": 0.0,
-                        "Grade Points": 0.0
-                    })
-                    st.rerun()
-            
-            # Semester stats
-            sem_gpa = calculate_gpa(courses_list)
-            sem_courses = sum(1 for c in courses_list if str(c.get("Course Name", "")).strip())
-            sem_credits = sum(float(c.get("Credit Hours", 0) or 0) for c in courses_list if str(c.get("Course Name", "")).strip())
-            
-            st.divider()
-            
-            stat_col1, stat_col2, stat_col3 = st.columns(3)
-            with stat_col1:
-                st.metric("GPA", f"{sem_gpa:.2f}")
-            with stat_col2:
-                st.metric("Courses", sem_courses)
-            with stat_col3:
-                st.metric("Credits", f"{sem_credits:.1f}")
+    semesters_area = st.container()
     
     st.divider()
     
     # Summary table
     st.subheader("Summary")
-    summary_data = []
+    aggregate_slots.append((st.empty(), render_summary))
     
-    for sem_name, courses_list in st.session_state.semesters_data.items():
-        gpa = calculate_gpa(courses_list)
-        courses_count = sum(1 for c in courses_list if str(c.get("Course Name", "")).strip())
-        credits = sum(float(c.get("Credit Hours", 0) or 0) for c in courses_list if str(c.get("Course Name", "")).strip())
-        
-        summary_data.append({
-            "Semester": sem_name,
-            "Courses": courses_count,
-            "Credits": f"{credits:.1f}",
-            "GPA": f"{gpa:.2f}"
-        })
+    st.divider()
+    
+    # Target planner: inputs are ordinary widgets; the answer is an aggregate
+    # slot so course edits in any semester fragment refresh it too
+    st.subheader("🎯 Target Planner")
+    planner_col1, planner_col2 = st.columns(2)
+    with planner_col1:
+        scale = current_scale()
+        st.number_input(
+            "Target CGPA",
+            min_value=0.0,
+            max_value=scale.max_points,
+            value=round(scale.max_points * 0.875, 2),
+            step=scale.step / 2,
+            key="planner_target"
+        )
+    with planner_col2:
+        st.number_input(
+            "Credits next semester",
+            min_value=0.5,
+            max_value=40.0,
+            value=15.0,
+            step=0.5,
+            key="planner_credits"
+        )
+    # The course editor needs pandas, so it stays off until asked for
+    if st.toggle(
+        "Plan individual courses",
+        key="planner_by_course",
+        help="List next semester's courses to see letter-grade combinations that reach the target"
+    ):
+        st.session_state.planned_courses = st.data_editor(
+            default_planned_courses(),
+            key="planner_courses_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Credit Hours": st.column_config.NumberColumn(
+                    "Credit Hours", min_value=0.0, max_value=10.0, step=0.5, default=3.0
+                ),
+            }
+        )
+    aggregate_slots.append((st.empty(), render_planner))
+    
+    if st.session_state.cohort is not None:
+        st.divider()
+        st.subheader("Cohort")
+        aggregate_slots.append((st.empty(), render_cohort))
     
-    if summary_data:
-        summary_df = pd.DataFrame(summary_data)
-        st.dataframe(summary_df, use_container_width=True, hide_index=True)
+    with semesters_area:
+        sem_names = list(st.session_state.semesters_data.keys())
+        for sem_name in sem_names:
+            if compact_view and sem_name != st.session_state.expanded_semester:
+                collapsed_semester_row(st.session_state.semester_ids[sem_name], results.semesters[sem_name])
+            else:
+                semester_section(sem_name, aggregate_slots)
+    run_timer.lap("semesters")
+    
+    draw_aggregates(aggregate_slots, results, run_timer)
+    run_timer.lap("aggregates")
 
 st.divider()
-st.markdown("""
-    <div style='text-align: center; color: #666; font-size: 0.9rem;'>
-    <p><strong>GPA:</strong> Σ(Credit Hours × Grade Points) / Σ(Credit Hours)</p>
-    <p><strong>CGPA:</strong> Σ(All Credits × Grades) / Σ(All Credits)</p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(static_assets["footer"], unsafe_allow_html=True)
+
+run_timer.lap("footer")
+finish_run(run_timer)
+st.session_state.full_run_complete = True
+
+# After the page is out, so the import never competes with the first paint
+preload_pandas()
@@ -0,0 +1,270 @@
+"""Benchmarks for the calculation helpers and a full headless rerun of app.py.
+
+Synthetic transcripts (1-50 semesters, 1-100 courses each, ~10% malformed
+rows) are loaded into an AppTest session. The functions are timed inside
+that script run, so get_total_courses/get_total_credits read the real
+session state. Results are written as JSON and can be compared against a
+stored baseline; any benchmark slower than baseline * (1 + tolerance)
+fails the run.
+
+Usage::
+
+    python benchmarks/bench_app.py --save-baseline        # on the deploy box
+    python benchmarks/bench_app.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gpa_engine import as_course, semester_totals  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+# (semesters, courses per semester)
+FUNCTION_SIZES = [(1, 1), (1, 100), (8, 6), (20, 20), (50, 100)]
+# (name, semesters, courses per semester, extra session state)
+RERUN_SCENARIOS = [
+    ("rows", 1, 5, {}),
+    ("rows", 8, 6, {}),
+    ("rows", 20, 10, {}),
+    ("grid", 20, 10, {"grid_mode": True}),
+    ("compact", 50, 100, {"compact_view": True}),
+]
+
+# Malformed rows: what a hand-edited import or an old session can contain
+MALFORMED_VALUES = [
+    {"Course Name": "", "Credit Hours": 3.0, "Grade Points": 3.0},
+    {"Course Name": "Bad credits", "Credit Hours": "abc", "Grade Points": 3.0},
+    {"Course Name": "No credits", "Credit Hours": None, "Grade Points": 2.0},
+    {"Course Name": "Negative", "Credit Hours": -3.0, "Grade Points": 4.0},
+    {"Course Name": "Letter grade", "Credit Hours": 3.0, "Grade Points": "A"},
+    {"Course Name": "Missing grade", "Credit Hours": 2.0},
+]
+# The row-mode widgets need numbers, so full reruns use malformed rows the UI can hold
+WIDGET_SAFE_MALFORMED = [
+    {"Course Name": "", "Credit Hours": 3.0, "Grade Points": 3.0},
+    {"Course Name": "Zero credits", "Credit Hours": 0.0, "Grade Points": 4.0},
+]
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def make_semesters(n_semesters, courses_per_semester, malformed_ratio=0.1, widget_safe=False, seed=0):
+    """semesters_data of Course records, parsed from dict rows as a load would"""
+    rng = random.Random(seed)
+    malformed = WIDGET_SAFE_MALFORMED if widget_safe else MALFORMED_VALUES
+    semesters_data = {}
+    for sem_idx in range(n_semesters):
+        courses_list = []
+        for course_idx in range(courses_per_semester):
+            if rng.random() < malformed_ratio:
+                courses_list.append(as_course(rng.choice(malformed)))
+            else:
+                courses_list.append(as_course({
+                    "Course Name": f"Course {sem_idx + 1}.{course_idx + 1}",
+                    "Credit Hours": float(rng.choice([1, 2, 3, 3, 4])),
+                    "Grade Points": round(rng.uniform(0.0, 4.0), 1),
+                }))
+        semesters_data[f"Semester {sem_idx + 1}"] = courses_list
+    return semesters_data
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def time_callable(func, repeat=5):
+    """Median/min seconds per call, with the loop count picked by autorange"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "loops": number}
+
+
+# app.py followed by a call into the benchmark, which gets the app's globals;
+# __file__ points at app.py so it finds its static/ assets
+HOOK_SCRIPT = (
+    "import streamlit as st\n"
+    f"__file__ = {APP_PATH!r}\n"
+    f"exec(compile(open({APP_PATH!r}, encoding='utf-8').read(), {APP_PATH!r}, 'exec'))\n"
+    "st.session_state.benchmark_hook(globals())\n"
+)
+
+
+def new_app_test(semesters_data, extra_state=None, script=None):
+    from streamlit.testing.v1 import AppTest
+
+    if script is None:
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+    else:
+        at = AppTest.from_string(script, default_timeout=600)
+    # A set transcript_id skips the store lookup, so the synthetic data stays
+    at.session_state.transcript_id = "benchmark"
+    at.session_state.semesters_data = semesters_data
+    for key, value in (extra_state or {}).items():
+        at.session_state[key] = value
+    return at
+
+
+def bench_functions(repeat):
+    """Time the app's own helpers inside a live script run"""
+    results = {}
+    for n_semesters, n_courses in FUNCTION_SIZES:
+        semesters_data = make_semesters(n_semesters, n_courses)
+        first_semester = next(iter(semesters_data.values()))
+        size = f"{n_semesters}x{n_courses}"
+
+        def hook(app):
+            cache = app["get_semester_cache"]()
+
+            # The semester cache would turn every call after the first into
+            # a lookup, so these clear it and time the full computation
+            def cold(func, arg):
+                def call():
+                    cache.clear()
+                    return func(arg)
+                return call
+
+            results[f"calculate_gpa[{size}]"] = time_callable(cold(app["calculate_gpa"], first_semester), repeat)
+            results[f"calculate_cgpa[{size}]"] = time_callable(cold(app["calculate_cgpa"], semesters_data), repeat)
+            results[f"calculate_gpa_cached[{size}]"] = time_callable(
+                lambda: app["calculate_gpa"](first_semester), repeat)
+            results[f"semester_totals[{size}]"] = time_callable(lambda: semester_totals(first_semester), repeat)
+            results[f"get_total_courses[{size}]"] = time_callable(app["get_total_courses"], repeat)
+            results[f"get_total_credits[{size}]"] = time_callable(app["get_total_credits"], repeat)
+
+        # Compact view keeps the surrounding script run cheap at large sizes
+        at = new_app_test(semesters_data, {"compact_view": True, "benchmark_hook": hook}, HOOK_SCRIPT)
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"app.py raised during the {size} function run: {at.exception}")
+    return results
+
+
+def bench_reruns(runs):
+    """Cold first run plus the median of `runs` warm reruns of app.py"""
+    results = {}
+    for mode, n_semesters, n_courses, extra_state in RERUN_SCENARIOS:
+        semesters_data = make_semesters(n_semesters, n_courses, widget_safe=True)
+        at = new_app_test(semesters_data, extra_state)
+        samples = []
+        for _ in range(runs + 1):
+            start = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(f"app.py raised in {mode} {n_semesters}x{n_courses}: {at.exception}")
+        warm = samples[1:]
+        results[f"full_rerun_{mode}[{n_semesters}x{n_courses}]"] = {
+            "median_s": statistics.median(warm),
+            "min_s": min(warm),
+            "cold_s": samples[0],
+            "loops": runs,
+        }
+    return results
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+
+def compare(results, baseline, tolerance):
+    """Return (rows, regressions); a row is (name, baseline_s, current_s, ratio).
+
+    Best-of-repeats times are compared: they are far less noisy than
+    medians on a shared machine, and noise only ever adds time.
+    """
+    rows, regressions = [], []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            rows.append((name, None, current["min_s"], None))
+            continue
+        ratio = current["min_s"] / previous["min_s"] if previous["min_s"] else float("inf")
+        rows.append((name, previous["min_s"], current["min_s"], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def print_table(rows, out=sys.stdout):
+    width = max(len(name) for name, *_ in rows)
+    for name, previous, current, ratio in rows:
+        change = "new" if ratio is None else f"x{ratio:.2f}"
+        print(f"{name:<{width}}  {_format_seconds(previous):>10}  {_format_seconds(current):>10}  {change}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GPA helpers and a full app.py rerun")
+    parser.add_argument("-o", "--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per function")
+    parser.add_argument("--runs", type=int, default=5, help="warm reruns per app scenario")
+    parser.add_argument("--skip-reruns", action="store_true", help="only time the functions")
+    args = parser.parse_args(argv)
+
+    # Keep the benchmark's sessions out of the real transcript database
+    os.environ.setdefault("CGPA_DB_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+
+    # AppTest's bare-mode and deprecation warnings would drown the table
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+
+    results = bench_functions(args.repeat)
+    if not args.skip_reruns:
+        results.update(bench_reruns(args.runs))
+
+    import streamlit
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    output = DEFAULT_BASELINE if args.save_baseline else args.output
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print_table(rows)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
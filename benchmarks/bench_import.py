@@ -0,0 +1,156 @@
+"""Cold-import benchmark: what a fresh process pays before its first line runs.
+
+Each target's imports run in a fresh ``python -X importtime`` subprocess
+(the module cache is empty every time, so nothing is amortized). For app.py
+the top-level import statements are pulled out with ast and run on their
+own, which is what a new Streamlit worker pays before drawing anything.
+The run fails if a HEAVY_MODULES entry is imported at startup, or, given a
+baseline, if any target got slower than baseline * (1 + tolerance).
+
+Usage::
+
+    python benchmarks/bench_import.py --save-baseline
+    python benchmarks/bench_import.py --baseline benchmarks/import_baseline.json --top 15
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from bench_app import ROOT, compare, print_table
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "import_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+# Loaded only when a feature needs them (file import, tables), never at startup
+HEAVY_MODULES = ("pandas", "pyarrow", "openpyxl")
+# (name, module imported); None means app.py's own top-level imports
+TARGETS = [
+    ("app", None),
+    ("grading", "grading"),
+    ("planner", "planner"),
+    ("cgpa_batch", "cgpa_batch"),
+    ("cgpa_api", "cgpa_api"),
+    ("transcript_import", "transcript_import"),
+]
+# Modules that exist to parse files, so pandas is expected there
+PANDAS_TARGETS = {"transcript_import"}
+
+REPORT = "import json, sys; print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))"
+
+
+def app_imports(path=os.path.join(ROOT, "app.py")):
+    """app.py's module-level import statements, as source"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header line
+        modules[fields[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+def time_import(source):
+    """(total seconds, {module: (self_us, cumulative_us)}, heavy modules loaded)"""
+    code = source + "\n" + REPORT.format(heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import failed:\n{proc.stderr[-2000:]}")
+    modules = parse_importtime(proc.stderr)
+    total_us = sum(self_us for self_us, _ in modules.values())
+    return total_us / 1e6, modules, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_imports(repeat):
+    results, profiles, heavy = {}, {}, {}
+    for name, module in TARGETS:
+        source = app_imports() if module is None else f"import {module}"
+        timings = []
+        for _ in range(repeat):
+            total, modules, loaded = time_import(source)
+            timings.append(total)
+            if total == min(timings):
+                profiles[name] = modules
+        results[f"import/{name}"] = {"min_s": min(timings), "max_s": max(timings), "repeat": repeat}
+        if name not in PANDAS_TARGETS:
+            heavy[name] = loaded
+    return results, profiles, heavy
+
+
+def print_top(name, modules, top, out=sys.stdout):
+    """The modules with the most self time, for finding what to make lazy"""
+    print(f"\n{name}: slowest modules (self / cumulative)", file=out)
+    ranked = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for module, (self_us, cumulative_us) in ranked:
+        print(f"  {self_us / 1e3:8.2f} ms  {cumulative_us / 1e3:8.2f} ms  {module}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold import time of the app and its modules")
+    parser.add_argument("-o", "--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules per target")
+    args = parser.parse_args(argv)
+
+    results, profiles, heavy = bench_imports(args.repeat)
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    output = DEFAULT_BASELINE if args.save_baseline else args.output
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print_table(rows)
+    if args.top:
+        for name, modules in profiles.items():
+            print_top(name, modules, args.top)
+
+    failed = 0
+    eager = {name: loaded for name, loaded in heavy.items() if loaded}
+    for name, loaded in eager.items():
+        print(f"{name} imports {', '.join(loaded)} at startup", file=sys.stderr)
+        failed = 1
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        failed = 1
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(main())
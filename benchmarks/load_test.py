@@ -0,0 +1,460 @@
+"""Load test: hundreds of concurrent sessions editing transcripts on one server.
+
+Starts ``streamlit run app.py`` headless on a local port and drives it over
+the same websocket protocol the browser uses: each virtual user is one
+websocket session sending BackMsg reruns with the widget it changed, and
+reading ForwardMsg deltas until the run finishes. Widgets inside a
+semester fragment are sent with their fragment id, so edits rerun only
+that fragment, as they do in a browser. All users run on one asyncio loop
+in this process; the server is a separate process, so its CPU and memory
+are measured on their own.
+
+Users loop through a realistic edit sequence: add a semester, type a
+course name, set credits and grade, add a course and fill it in, change
+an earlier grade, delete a course, and drop the oldest semester past
+MAX_SEMESTERS. Optional think time goes between actions.
+
+Stages run at increasing user counts. Each reports:
+
+* per-rerun latency percentiles, overall and by action. This is the time
+  from sending the rerun to the final script_finished, i.e. what a user
+  waits for, without browser rendering;
+* server CPU utilization and server CPU per rerun (script, protocol and
+  websocket work together), plus script CPU per rerun and per session from
+  the app's perf records (thread CPU of each session's runs);
+* server RSS growth per session (VmRSS, /proc, Linux only);
+* throughput in reruns/s.
+
+The throughput ceiling is the best reruns/s of any stage. The capacity
+line names the largest stage whose p95 stays under --slo-ms. On a small
+box the client shares CPUs with the server, so its own CPU time is
+reported too.
+
+Usage::
+
+    python benchmarks/load_test.py                          # 1, 10, 50, 100 users, 20 s each
+    python benchmarks/load_test.py --users 100,200,400 --duration 60 --think 1000 -o load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+from bench_app import APP_PATH, ROOT
+
+DEFAULT_USERS = "1,10,50,100"
+DEFAULT_DURATION = 20.0   # seconds per stage
+DEFAULT_SLO_MS = 500.0    # p95 a stage must stay under to count as served
+RUN_TIMEOUT = 120.0       # seconds one rerun may take before the user gives up
+STARTUP_TIMEOUT = 60.0
+MAX_SEMESTERS = 8         # past this, a user deletes its oldest semester
+CONNECT_BATCH = 25        # sessions opened at once while ramping up a stage
+
+# A standard first-year load, so users overlap the way a cohort does
+COURSE_NAMES = [
+    "Calculus I", "Physics I", "Chemistry", "English Composition", "Programming I",
+    "Linear Algebra", "Statistics", "Economics", "History", "Biology",
+]
+CREDIT_HOURS = [1.0, 2.0, 3.0, 3.0, 3.0, 4.0]
+GRADE_POINTS = [4.0, 3.7, 3.3, 3.0, 2.7, 2.3, 2.0, 1.0, 0.0]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list (None if empty)"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(seconds):
+    ordered = sorted(seconds)
+    summary = {"count": len(ordered)}
+    for q in (50, 95, 99):
+        summary[f"p{q}_ms"] = None if not ordered else round(percentile(ordered, q) * 1000, 2)
+    summary["max_ms"] = None if not ordered else round(ordered[-1] * 1000, 2)
+    return summary
+
+# ============================================================================
+# SERVER PROCESS
+# ============================================================================
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_cpu_seconds(pid):
+    """utime + stime of a process, from /proc (None off Linux)"""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            # The command name may hold spaces; fields after it are fixed
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def start_server(port, env):
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.address", "127.0.0.1",
+            "--browser.gatherUsageStats", "false",
+            "--server.fileWatcherType", "none",
+        ],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited: {server.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"streamlit did not answer on port {port} within {STARTUP_TIMEOUT:g} s")
+
+# ============================================================================
+# VIRTUAL USERS - one websocket session each
+# ============================================================================
+
+class ScriptError(Exception):
+    """The app raised: the run drew an exception element"""
+
+
+class VirtualUser:
+    """One browser tab's worth of protocol: reruns in, deltas out"""
+
+    def __init__(self, url, user_id, seed):
+        self.url = url
+        self.user_id = user_id
+        self.rng = random.Random(seed * 100003 + user_id)
+        # The transcript id doubles as the perf records' session id
+        self.session_id = f"load-{user_id}-{uuid.uuid4().hex[:8]}"
+        self.ws = None
+        self.buttons = {}    # label -> widget id, for unkeyed sidebar buttons
+        self.widgets = {}    # key -> (widget id, fragment id)
+        self.semesters = {}  # semester id -> [course id, ...], in page order
+        self.samples = []    # (action, seconds)
+        self.errors = []
+
+    async def open(self):
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(f"{self.url}/_stcore/stream", max_size=None)
+        await self._rerun("open")
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _rerun(self, action, widget_state=None, fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = f"sid={self.session_id}"
+        msg.rerun_script.fragment_id = fragment_id
+        if widget_state is not None:
+            msg.rerun_script.widget_states.widgets.append(widget_state)
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._read_run(), RUN_TIMEOUT)
+        self.samples.append((action, time.perf_counter() - started))
+
+    async def _read_run(self):
+        """Read until the run (and any st.rerun it triggered) finishes"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        drawn = []  # (key or None, element, widget id, fragment id) in page order
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element_type = fwd.delta.new_element.WhichOneof("type")
+                element = getattr(fwd.delta.new_element, element_type)
+                if element_type == "exception":
+                    raise ScriptError(f"{element.type}: {element.message}")
+                widget_id = getattr(element, "id", "")
+                if widget_id.startswith("$$ID-"):
+                    key = widget_id.split("-", 2)[2]
+                    drawn.append((None if key == "None" else key, element, widget_id, fwd.delta.fragment_id))
+            elif kind == "script_finished":
+                status = fwd.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    drawn = []  # st.rerun(): the next run redraws everything
+                    continue
+                self._index(drawn, full_run=status == ForwardMsg.FINISHED_SUCCESSFULLY)
+                return
+
+    def _index(self, drawn, full_run):
+        """Rebuild the widget map from one run's elements (a fragment run redraws one semester)"""
+        if full_run:
+            self.buttons, self.widgets, self.semesters = {}, {}, {}
+        current = None
+        for key, element, widget_id, fragment_id in drawn:
+            if key is None:
+                self.buttons[getattr(element, "label", "")] = widget_id
+                continue
+            self.widgets[key] = (widget_id, fragment_id)
+            if key.startswith("del_course_"):
+                continue
+            if key.startswith("del_"):
+                current = key[len("del_"):]
+                self.semesters[current] = []
+            elif key.startswith("course_name_") and current is not None:
+                self.semesters[current].append(key[len("course_name_"):])
+
+    async def _set(self, action, key, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, fragment_id = self.widgets[key]
+        await self._rerun(action, WidgetState(id=widget_id, **value), fragment_id)
+
+    async def _fill_course(self, course_id):
+        rng = self.rng
+        await self._set("type name", f"course_name_{course_id}", string_value=rng.choice(COURSE_NAMES))
+        await self._set("set credits", f"credit_hours_{course_id}", double_value=rng.choice(CREDIT_HOURS))
+        await self._set("set grade", f"grade_points_{course_id}", double_value=rng.choice(GRADE_POINTS))
+
+    async def edit_sequence(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        if len(self.semesters) >= MAX_SEMESTERS:
+            oldest = next(iter(self.semesters))
+            await self._set("delete semester", f"del_{oldest}", trigger_value=True)
+
+        add_semester = WidgetState(id=self.buttons["➕ Add Semester"], trigger_value=True)
+        await self._rerun("add semester", add_semester)
+        sem_id = list(self.semesters)[-1]
+        await self._fill_course(self.semesters[sem_id][0])
+
+        await self._set("add course", f"add_course_{sem_id}", trigger_value=True)
+        await self._fill_course(self.semesters[sem_id][-1])
+
+        # Revisit an earlier grade somewhere in the transcript
+        other = self.rng.choice(list(self.semesters))
+        course_id = self.rng.choice(self.semesters[other])
+        await self._set("change grade", f"grade_points_{course_id}", double_value=self.rng.choice(GRADE_POINTS))
+
+        await self._set("delete course", f"del_course_{self.semesters[sem_id][-1]}", trigger_value=True)
+
+    async def loop(self, stop, think):
+        try:
+            while not stop.is_set():
+                await self.edit_sequence()
+                if think:
+                    await asyncio.sleep(self.rng.uniform(0.5, 1.5) * think)
+        except Exception as exc:  # one broken session ends that user, not the stage
+            self.errors.append(f"{type(exc).__name__}: {exc}")
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+def read_perf_log(path, session_ids):
+    """{session id: [cpu_ms, ...]} for the given sessions, from the app's perf JSON lines"""
+    cpu = {}
+    if not os.path.exists(path):
+        return cpu
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["session"] in session_ids:
+                cpu.setdefault(record["session"], []).append(record.get("cpu_ms") or 0.0)
+    return cpu
+
+
+async def run_stage(url, server_pid, n_users, duration, think, seed, perf_log):
+    users = [VirtualUser(url, user_id, seed) for user_id in range(n_users)]
+    rss_before = process_rss_bytes(server_pid)
+    for start in range(0, n_users, CONNECT_BATCH):
+        batch = users[start:start + CONNECT_BATCH]
+        opened = await asyncio.gather(*(user.open() for user in batch), return_exceptions=True)
+        for user, result in zip(batch, opened):
+            if isinstance(result, Exception):
+                user.errors.append(f"open: {type(result).__name__}: {result}")
+
+    stop = asyncio.Event()
+    live = [user for user in users if not user.errors]
+    server_cpu_started = process_cpu_seconds(server_pid)
+    client_cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    samples_before = sum(len(user.samples) for user in users)
+    tasks = [asyncio.create_task(user.loop(stop, think)) for user in live]
+    await asyncio.sleep(duration)
+    stop.set()
+    # Every session is connected and warm here, so this is the stage's footprint
+    rss_after = process_rss_bytes(server_pid)
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall_started
+    server_cpu = process_cpu_seconds(server_pid)
+    client_cpu = time.process_time() - client_cpu_started
+    await asyncio.gather(*(user.close() for user in users), return_exceptions=True)
+
+    samples = [sample for user in users for sample in user.samples]
+    reruns = len(samples) - samples_before
+    by_action = {}
+    for action, seconds in samples:
+        by_action.setdefault(action, []).append(seconds)
+    session_cpu = read_perf_log(perf_log, {user.session_id for user in users})
+    cpu_runs = [ms for runs in session_cpu.values() for ms in runs]
+    errors = [error for user in users for error in user.errors]
+    return {
+        "users": n_users,
+        "wall_s": round(wall, 2),
+        "reruns": reruns,
+        "throughput_rps": round(reruns / wall, 2),
+        "server_cpu_utilization": (
+            None if server_cpu is None else round((server_cpu - server_cpu_started) / wall, 3)
+        ),
+        "server_cpu_ms_per_rerun": (
+            None if server_cpu is None or not reruns
+            else round((server_cpu - server_cpu_started) / reruns * 1000, 2)
+        ),
+        "client_cpu_utilization": round(client_cpu / wall, 3),
+        "latency": latency_summary([seconds for _, seconds in samples]),
+        "by_action": {action: latency_summary(values) for action, values in sorted(by_action.items())},
+        "cpu_ms_per_rerun": round(sum(cpu_runs) / len(cpu_runs), 2) if cpu_runs else None,
+        "cpu_s_per_session": round(sum(cpu_runs) / n_users / 1000, 3) if cpu_runs else None,
+        "rss_mb_per_session": (
+            round((rss_after - rss_before) / n_users / 2**20, 3) if rss_before and rss_after else None
+        ),
+        "errors": len(errors),
+        "first_errors": errors[:5],
+    }
+
+
+def _number(value, spec, missing="-"):
+    return missing if value is None else format(value, spec)
+
+
+def print_stage(stage, out=sys.stdout):
+    latency = stage["latency"]
+    print(
+        f"{stage['users']:>5} users  {stage['throughput_rps']:>7.1f} reruns/s  "
+        f"p50 {_number(latency['p50_ms'], '.1f'):>7} ms  p95 {_number(latency['p95_ms'], '.1f'):>7} ms  "
+        f"p99 {_number(latency['p99_ms'], '.1f'):>7} ms  "
+        f"server cpu {_number(stage['server_cpu_utilization'], '.0%'):>5}  "
+        f"{_number(stage['server_cpu_ms_per_rerun'], '.1f'):>6} server / "
+        f"{_number(stage['cpu_ms_per_rerun'], '.1f'):>5} script cpu-ms/rerun  "
+        f"{_number(stage['rss_mb_per_session'], '.2f'):>6} MB/session  "
+        f"{stage['errors']} errors",
+        file=out,
+    )
+
+
+async def warm_up(url, seed):
+    """One session through the sequence, so stage 1 doesn't pay imports and first-use caches"""
+    user = VirtualUser(url, -1, seed)
+    try:
+        await user.open()
+        await user.edit_sequence()
+    finally:
+        await user.close()
+    await asyncio.sleep(2)  # let the app's background pandas preload finish
+
+
+async def run_stages(url, server_pid, user_counts, args, perf_log):
+    await warm_up(url, args.seed)
+    stages = []
+    for n_users in user_counts:
+        stage = await run_stage(url, server_pid, n_users, args.duration, args.think / 1000, args.seed, perf_log)
+        stages.append(stage)
+        print_stage(stage)
+        for error in stage["first_errors"]:
+            print(f"    {error}", file=sys.stderr)
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive many concurrent sessions against a local app.py server")
+    parser.add_argument("--users", default=DEFAULT_USERS,
+                        help="comma-separated concurrent users per stage (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per stage")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="mean think time between edit sequences in ms (default: 0, saturate)")
+    parser.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS,
+                        help="p95 latency a stage must stay under (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=None, help="server port (default: a free one)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="write results JSON here")
+    args = parser.parse_args(argv)
+    user_counts = [int(count) for count in args.users.split(",")]
+
+    # The server saves to a throwaway database and logs per-run CPU for the report
+    workdir = tempfile.mkdtemp(prefix="cgpa-load-")
+    perf_log = os.path.join(workdir, "perf.jsonl")
+    env = dict(
+        os.environ,
+        CGPA_DB_PATH=os.path.join(workdir, "load.sqlite3"),
+        CGPA_PERF="1",
+        CGPA_PERF_LOG=perf_log,
+    )
+    port = args.port or free_port()
+    server = start_server(port, env)
+    try:
+        stages = asyncio.run(run_stages(f"ws://127.0.0.1:{port}", server.pid, user_counts, args, perf_log))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    ceiling = max(stages, key=lambda stage: stage["throughput_rps"])
+    served = [stage for stage in stages if (stage["latency"]["p95_ms"] or 0) <= args.slo_ms]
+    print(f"\nThroughput ceiling: {ceiling['throughput_rps']:.1f} reruns/s at {ceiling['users']} users")
+    if served:
+        print(f"Largest stage with p95 <= {args.slo_ms:g} ms: {max(stage['users'] for stage in served)} users")
+    else:
+        print(f"No stage kept p95 <= {args.slo_ms:g} ms")
+
+    if args.output:
+        import streamlit
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "streamlit": streamlit.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "duration_s": args.duration,
+                "think_ms": args.think,
+                "slo_ms": args.slo_ms,
+            },
+            "stages": stages,
+            "ceiling": {"users": ceiling["users"], "throughput_rps": ceiling["throughput_rps"]},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 1 if any(stage["errors"] for stage in stages) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Local JSON/HTTP service exposing the GPA engine.
+
+Returns the same per-semester GPA, CGPA, credit and course numbers the app
+shows (cgpa_batch.summarize), for one transcript or a batch per request.
+Each worker process runs its own asyncio loop with keep-alive HTTP/1.1
+connections; ``--workers`` processes share the port via SO_REUSEPORT, so
+the kernel spreads connections across them. A single transcript costs
+tens of microseconds, so requests are computed inline on the loop; large
+batches yield to the loop between chunks so they don't stall other
+connections.
+
+Endpoints
+---------
+GET  /healthz    ``{"ok": true}``
+POST /v1/summary ``{"student_id": "...", "semesters": {...}, "scale": "4.0"}``
+                 → one summary object
+POST /v1/batch   ``{"transcripts": [{"student_id": ..., "semesters": ...}], "scale": "4.0"}``
+                 → ``{"results": [summary, ...]}`` in input order
+
+``semesters`` has the JSONL batch format: ``{"Semester 1": [{course}, ...]}``.
+
+Usage::
+
+    python cgpa_api.py --port 8600 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+from http import HTTPStatus
+
+from cgpa_batch import summarize
+from grading import DEFAULT_SCALE, SCALES
+
+DEFAULT_PORT = 8600
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+YIELD_EVERY = 200  # transcripts computed between yields to the event loop
+
+logger = logging.getLogger("cgpa.api")
+
+
+class RequestError(Exception):
+    """Client error, answered with `status` and a JSON error message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ============================================================================
+# REQUEST HANDLING
+# ============================================================================
+
+def _max_points(payload):
+    scale = payload.get("scale", DEFAULT_SCALE)
+    if not isinstance(scale, str) or scale not in SCALES:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"unknown scale {scale!r}; expected one of {list(SCALES)}")
+    return SCALES[scale].max_points
+
+
+def _transcript(record, position, default_id=None):
+    if not isinstance(record, dict) or not isinstance(record.get("semesters"), dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"transcript {position}: 'semesters' must be an object")
+    return record.get("student_id", default_id), record["semesters"]
+
+
+def _decode(body):
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+    return payload
+
+
+async def handle_summary(body):
+    payload = _decode(body)
+    student_id, semesters_data = _transcript(payload, 1)
+    return summarize(student_id, semesters_data, _max_points(payload))
+
+
+async def handle_batch(body):
+    payload = _decode(body)
+    max_points = _max_points(payload)
+    transcripts = payload.get("transcripts")
+    if not isinstance(transcripts, list):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'transcripts' must be an array")
+    # Validate everything first, so a bad record fails before any work is done
+    parsed = [
+        _transcript(record, position, str(position))
+        for position, record in enumerate(transcripts, start=1)
+    ]
+    results = []
+    for start in range(0, len(parsed), YIELD_EVERY):
+        results.extend(
+            summarize(student_id, semesters_data, max_points)
+            for student_id, semesters_data in parsed[start:start + YIELD_EVERY]
+        )
+        await asyncio.sleep(0)
+    return {"results": results}
+
+
+async def handle_health(body):
+    return {"ok": True}
+
+
+ROUTES = {
+    ("GET", "/healthz"): handle_health,
+    ("POST", "/v1/summary"): handle_summary,
+    ("POST", "/v1/batch"): handle_batch,
+}
+
+# ============================================================================
+# HTTP/1.1 - just enough for JSON over keep-alive connections
+# ============================================================================
+
+async def read_request(reader):
+    """(method, path, version, headers, body) or None when the client closed the connection"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many header lines")
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise RequestError(HTTPStatus.LENGTH_REQUIRED, "chunked bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], version, headers, body
+
+
+def _keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve_connection(reader, writer):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                keep_alive = _keep_alive(version, headers)
+                handler = ROUTES.get((method, path))
+                if handler is None:
+                    known = any(route_path == path for _, route_path in ROUTES)
+                    status = HTTPStatus.METHOD_NOT_ALLOWED if known else HTTPStatus.NOT_FOUND
+                    raise RequestError(status, f"{method} {path} is not supported")
+                status, payload = HTTPStatus.OK, await handler(body)
+            except RequestError as exc:
+                status, payload = exc.status, {"error": str(exc)}
+            except asyncio.IncompleteReadError:
+                break
+            except Exception:
+                logger.exception("request failed")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+# ============================================================================
+# WORKER POOL - one event loop per process, sharing the listening port
+# ============================================================================
+
+def _listening_socket(host, port, reuse_port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+async def _serve(sock):
+    server = await asyncio.start_server(serve_connection, sock=sock)
+    async with server:
+        await server.serve_forever()
+
+
+def run_worker(host, port, reuse_port, sock=None):
+    if sock is None:
+        sock = _listening_socket(host, port, reuse_port)
+    try:
+        asyncio.run(_serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=1):
+    """Run `workers` server processes on host:port until interrupted"""
+    reuse_port = workers > 1 and hasattr(socket, "SO_REUSEPORT")
+    if workers > 1 and not reuse_port:
+        print("SO_REUSEPORT is unavailable here; running a single worker", file=sys.stderr)
+        workers = 1
+    if workers == 1:
+        # Bind before announcing, so "listening" means connections will succeed
+        sock = _listening_socket(host, port, reuse_port=False)
+        print(f"Listening on http://{host}:{port} (1 worker)", file=sys.stderr)
+        run_worker(host, port, False, sock)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(host, port, True), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Listening on http://{host}:{port} ({workers} workers)", file=sys.stderr)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve GPA/CGPA summaries over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="server processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers or os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    main()
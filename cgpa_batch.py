@@ -0,0 +1,228 @@
+"""Headless batch GPA/CGPA computation over many transcripts.
+
+Streams transcripts from CSV or JSONL, computes every semester GPA and the
+CGPA with the same engine and rounding the app displays, and writes the
+results incrementally (in input order) while a process pool does the math.
+
+Input formats
+-------------
+CSV   one row per course with the columns ``Student ID, Semester,
+      Course Name, Credit Hours, Grade Points``; rows of one student must
+      be contiguous.
+JSONL one transcript per line:
+      ``{"student_id": "...", "semesters": {"Semester 1": [{course}, ...]}}``
+
+Usage::
+
+    python cgpa_batch.py cohort.csv -o results.jsonl --workers 8
+"""
+import argparse
+import collections
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from gpa_engine import GPAResults
+from grading import DEFAULT_SCALE, SCALES
+
+STUDENT_COLUMN = "Student ID"
+SEMESTER_COLUMN = "Semester"
+COURSE_FIELDS = ("Course Name", "Credit Hours", "Grade Points")
+OUTPUT_COLUMNS = ("Student ID", "Semester", "Courses", "Credits", "GPA", "CGPA")
+
+# ============================================================================
+# READERS - generators, one (student_id, semesters_data) at a time
+# ============================================================================
+
+def read_csv_transcripts(lines):
+    """Group contiguous CSV course rows into per-student transcripts.
+
+    Raises ValueError if the header lacks Student ID or a course column.
+    """
+    reader = csv.DictReader(lines)
+    # A BOM that reached us (stdin, a plain utf-8 open) would hide "Student ID"
+    header = [column.lstrip("\ufeff").strip() for column in reader.fieldnames or ()]
+    missing = [column for column in (STUDENT_COLUMN, *COURSE_FIELDS) if column not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing {', '.join(missing)}")
+    reader.fieldnames = header
+    student_id, semesters_data = None, None
+    for row in reader:
+        row_student = row.get(STUDENT_COLUMN, "")
+        if row_student != student_id:
+            if semesters_data is not None:
+                yield student_id, semesters_data
+            student_id, semesters_data = row_student, {}
+        course = {field: row.get(field) for field in COURSE_FIELDS}
+        semesters_data.setdefault(row.get(SEMESTER_COLUMN, ""), []).append(course)
+    if semesters_data is not None:
+        yield student_id, semesters_data
+
+
+def read_jsonl_transcripts(lines):
+    """One JSON transcript object per non-blank line"""
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"line {line_no}: a transcript must be a JSON object")
+        semesters_data = record.get("semesters")
+        if not isinstance(semesters_data, dict):
+            raise ValueError(f"line {line_no}: 'semesters' must be an object")
+        yield record.get("student_id", str(line_no)), semesters_data
+
+
+def read_transcripts(lines, fmt):
+    if fmt == "csv":
+        return read_csv_transcripts(lines)
+    return read_jsonl_transcripts(lines)
+
+# ============================================================================
+# COMPUTATION - runs inside worker processes
+# ============================================================================
+
+def summarize(student_id, semesters_data, max_points):
+    """Per-semester and cumulative numbers, as the app's summary shows them"""
+    results = GPAResults.from_semesters(semesters_data, max_points)
+    return {
+        "student_id": student_id,
+        "cgpa": results.cgpa,
+        "semesters": results.semester_count,
+        "courses": results.total_courses,
+        "credits": results.total_credits,
+        "semester_results": [
+            {
+                "semester": sem.name,
+                "gpa": sem.gpa,
+                "courses": sem.courses,
+                "credits": round(sem.credits, 1),
+            }
+            for sem in results.semesters.values()
+        ],
+    }
+
+
+def summarize_chunk(chunk, max_points):
+    return [summarize(student_id, semesters_data, max_points) for student_id, semesters_data in chunk]
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+class JSONLWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, summary):
+        self.out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+
+class CSVWriter:
+    """One row per student-semester, formatted like the app's Summary table"""
+
+    def __init__(self, out):
+        self.writer = csv.writer(out)
+        self.writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, summary):
+        cgpa = f"{summary['cgpa']:.2f}"
+        for sem in summary["semester_results"]:
+            self.writer.writerow((
+                summary["student_id"],
+                sem["semester"],
+                sem["courses"],
+                f"{sem['credits']:.1f}",
+                f"{sem['gpa']:.2f}",
+                cgpa,
+            ))
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(transcripts, writer, workers=None, chunk_size=500, max_points=SCALES[DEFAULT_SCALE].max_points):
+    """Compute summaries in a process pool and write them in input order.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded
+    however many transcripts the input holds. Returns the transcript count.
+    """
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    if workers == 1:
+        for chunk in chunked(transcripts, chunk_size):
+            for summary in summarize_chunk(chunk, max_points):
+                writer.write(summary)
+                written += 1
+        return written
+
+    in_flight = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunked(transcripts, chunk_size):
+            in_flight.append(pool.submit(summarize_chunk, chunk, max_points))
+            while len(in_flight) >= 2 * workers:
+                for summary in in_flight.popleft().result():
+                    writer.write(summary)
+                    written += 1
+        while in_flight:
+            for summary in in_flight.popleft().result():
+                writer.write(summary)
+                written += 1
+    return written
+
+
+def detect_format(path, explicit):
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute semester GPAs and CGPA for many transcripts")
+    parser.add_argument("input", help="CSV or JSONL transcript file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="transcripts per worker task")
+    parser.add_argument("--scale", choices=list(SCALES), default=DEFAULT_SCALE,
+                        help="grading scale the grade points are on (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format)
+
+    # utf-8-sig: spreadsheet exports often start with a BOM
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = CSVWriter(dst) if output_format == "csv" else JSONLWriter(dst)
+        count = run_batch(
+            read_transcripts(src, input_format), writer, args.workers, args.chunk_size,
+            SCALES[args.scale].max_points,
+        )
+    except ValueError as exc:
+        sys.exit(f"cgpa_batch: {exc}")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"Processed {count} transcripts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cohort analytics: where one CGPA sits among many students'.
+
+Every student's CGPA comes from the same RunningTotals the app's summary
+and cgpa_batch read, and is kept in a sorted NumPy array, so rank and
+percentile lookups are a binary search (O(log n)) however large the
+cohort is. The distribution is counted into fixed-width bins once, at
+load time; charts read the bin counts, never the raw rows.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from cgpa_batch import read_transcripts
+from gpa_engine import MAX_GRADE_POINTS, RunningTotals
+
+BIN_WIDTH = 0.25
+
+
+def cohort_cgpa(semesters_data, max_points=MAX_GRADE_POINTS):
+    """CGPA from the engine's running totals, as the app ranks it and cgpa_batch reports it"""
+    if not isinstance(semesters_data, dict) or not semesters_data:
+        return 0.0
+    return RunningTotals.from_semesters(semesters_data).cgpa(max_points)
+
+
+class CohortPosition(NamedTuple):
+    cgpa: float
+    rank: int          # 1 + students with a strictly higher CGPA
+    percentile: float  # % of the cohort at or below this CGPA
+
+
+class CohortStats:
+    """Sorted CGPAs plus pre-binned counts for a whole cohort"""
+
+    __slots__ = ("student_ids", "cgpas", "sorted_cgpas", "bin_edges", "bin_counts", "_by_student")
+
+    def __init__(self, student_ids, cgpas, max_points=MAX_GRADE_POINTS, bin_width=BIN_WIDTH):
+        self.student_ids = list(student_ids)
+        self.cgpas = np.asarray(cgpas, dtype=np.float64)
+        self.sorted_cgpas = np.sort(self.cgpas)
+        n_bins = max(1, int(round(max_points / bin_width)))
+        self.bin_edges = np.linspace(0.0, max_points, n_bins + 1)
+        self.bin_counts, _ = np.histogram(self.cgpas, bins=self.bin_edges)
+        self._by_student = dict(zip(self.student_ids, self.cgpas.tolist()))
+
+    @classmethod
+    def from_transcripts(cls, transcripts, max_points=MAX_GRADE_POINTS):
+        """Build from (student_id, semesters_data) pairs, e.g. cgpa_batch's readers"""
+        student_ids, cgpas = [], []
+        for student_id, semesters_data in transcripts:
+            student_ids.append(student_id)
+            cgpas.append(cohort_cgpa(semesters_data, max_points))
+        return cls(student_ids, cgpas, max_points)
+
+    @classmethod
+    def from_file(cls, lines, fmt, max_points=MAX_GRADE_POINTS):
+        """Build from a cohort file in the batch CLI's CSV or JSONL format"""
+        return cls.from_transcripts(read_transcripts(lines, fmt), max_points)
+
+    def __len__(self):
+        return len(self.sorted_cgpas)
+
+    def rank(self, cgpa):
+        above = len(self.sorted_cgpas) - np.searchsorted(self.sorted_cgpas, cgpa, side="right")
+        return int(above) + 1
+
+    def percentile(self, cgpa):
+        if not len(self.sorted_cgpas):
+            return 0.0
+        at_or_below = np.searchsorted(self.sorted_cgpas, cgpa, side="right")
+        return 100.0 * int(at_or_below) / len(self.sorted_cgpas)
+
+    def position(self, cgpa):
+        return CohortPosition(cgpa, self.rank(cgpa), self.percentile(cgpa))
+
+    def student(self, student_id):
+        """CohortPosition of a cohort member, or None if the id is unknown"""
+        cgpa = self._by_student.get(student_id)
+        return None if cgpa is None else self.position(cgpa)
+
+    def quantile(self, q):
+        """Nearest-rank quantile (q in [0, 1]), O(1) on the sorted array"""
+        n = len(self.sorted_cgpas)
+        if not n:
+            return 0.0
+        return float(self.sorted_cgpas[min(max(math.ceil(q * n), 1), n) - 1])
+
+    def histogram(self):
+        """[(bin label, student count), ...] from the pre-binned counts"""
+        return [
+            (f"{low:.2f}–{high:.2f}", int(count))
+            for low, high, count in zip(self.bin_edges[:-1], self.bin_edges[1:], self.bin_counts)
+        ]
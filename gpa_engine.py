@@ -0,0 +1,581 @@
+"""Columnar GPA/CGPA engine.
+
+Course rows are Course records whose fields are parsed once, when the row
+is created. Bulk work flattens them into parallel NumPy arrays (semester
+ids, credit hours and grade points as integers in decimal units, validity
+masks), so every semester's totals come out of one vectorized pass; single
+edits adjust the running totals by one row's contribution in the same
+units. Every GPA on the page, in the batch CLI, the API and the cohort
+view is read from those exact totals, so they all agree to the last digit.
+Legacy course dicts are still accepted and parsed on the way in.
+"""
+import collections
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+MAX_GRADE_POINTS = 4.0
+
+# ============================================================================
+# ROW PARSING
+# ============================================================================
+
+MAX_ABS_VALUE = 1e9  # anything larger is garbage, not a credit or grade
+
+
+def _parse_number(value):
+    """float(value or 0), or None if it isn't a finite, plausible number"""
+    try:
+        number = float(value or 0)
+    except (ValueError, TypeError):
+        return None
+    return number if abs(number) <= MAX_ABS_VALUE else None
+
+
+class Course(NamedTuple):
+    """One course row, parsed once.
+
+    name is stripped ("" = unnamed); credit_hours/grade_points are floats,
+    or None when the input wasn't a usable number (blank counts as 0.0).
+    """
+    name: str
+    credit_hours: Optional[float]
+    grade_points: Optional[float]
+
+    @classmethod
+    def parse(cls, name, credit_hours, grade_points):
+        return cls(str(name).strip(), _parse_number(credit_hours), _parse_number(grade_points))
+
+    @classmethod
+    def from_dict(cls, course):
+        """Course for a legacy {"Course Name", "Credit Hours", "Grade Points"} dict"""
+        return cls.parse(course.get("Course Name", ""), course.get("Credit Hours"), course.get("Grade Points"))
+
+    def to_dict(self):
+        return {"Course Name": self.name, "Credit Hours": self.credit_hours, "Grade Points": self.grade_points}
+
+    def with_value(self, field, value):
+        """Copy with one field replaced by a freshly parsed value"""
+        parsed = str(value).strip() if field == "name" else _parse_number(value)
+        return self._replace(**{field: parsed})
+
+
+def as_course(course):
+    """Course for a Course or legacy dict row; None for anything else"""
+    if type(course) is Course:
+        return course
+    if isinstance(course, dict):
+        return Course.from_dict(course)
+    return None
+
+
+def _parse_course(course):
+    """Return (named, credit_hours, credit_ok, grade_points, grade_ok) for one Course"""
+    credit_hours = course.credit_hours
+    grade_points = course.grade_points
+    return (
+        course.name != "",
+        credit_hours or 0.0,
+        credit_hours is not None,
+        grade_points or 0.0,
+        grade_points is not None,
+    )
+
+
+def clamp_gpa(gpa, max_points=MAX_GRADE_POINTS):
+    """Clamp to [0, max_points] and round to 2 places, as the app displays it"""
+    return round(max(0.0, min(gpa, max_points)), 2)
+
+# ============================================================================
+# RUNNING TOTALS
+# ============================================================================
+
+# Running sums are exact integers in decimal units: credit hours and grade
+# points are counted in millionths, so a product is in millionths squared.
+# A value typed with up to six decimals converts exactly, so every total is
+# the true decimal sum, and a course's contribution cancels exactly when it
+# is subtracted again.
+DECIMAL_UNIT = 10 ** 6
+
+
+def _to_units(value):
+    return round(value * DECIMAL_UNIT)
+
+
+def course_contribution(course):
+    """Return one row's integer (Σcredits, Σcredits×points, valid, named, named credits)"""
+    course = as_course(course)
+    if course is None:
+        return (0, 0, 0, 0, 0)
+    named, credit_hours, credit_ok, grade_points, grade_ok = _parse_course(course)
+    credit_units = _to_units(credit_hours)
+    listed_credits = credit_units if named and credit_ok else 0
+    if named and credit_ok and grade_ok and credit_hours > 0:
+        return (credit_units, credit_units * _to_units(grade_points), 1, 1, listed_credits)
+    return (0, 0, 0, int(named), listed_credits)
+
+
+class SemesterTotals:
+    """Cached sums for one semester (or the whole transcript).
+
+    Credit and point sums are integers in decimal units, so adding and
+    later subtracting a course leaves no float residue: the GPA after any
+    sequence of edits is the same as after a fresh rebuild, and it is the
+    decimal Σ(credits × points) / Σcredits rounded half-up.
+    """
+
+    __slots__ = ("_credits", "_points", "valid_courses", "courses", "_listed_credits")
+
+    def __init__(self, credits=0, points=0, valid_courses=0, courses=0, listed_credits=0):
+        self._credits = credits
+        self._points = points
+        self.valid_courses = valid_courses
+        self.courses = courses
+        self._listed_credits = listed_credits
+
+    @property
+    def credits(self):
+        return self._credits / DECIMAL_UNIT
+
+    @property
+    def points(self):
+        return self._points / DECIMAL_UNIT ** 2
+
+    @property
+    def listed_credits(self):
+        return self._listed_credits / DECIMAL_UNIT
+
+    def apply(self, delta, sign=1):
+        """Add (sign=1) or subtract (sign=-1) a contribution tuple in O(1)"""
+        self._credits += sign * delta[0]
+        self._points += sign * delta[1]
+        self.valid_courses += sign * delta[2]
+        self.courses += sign * delta[3]
+        self._listed_credits += sign * delta[4]
+
+    def as_delta(self):
+        return (self._credits, self._points, self.valid_courses, self.courses, self._listed_credits)
+
+    def gpa(self, max_points=MAX_GRADE_POINTS):
+        if self._credits == 0:
+            return 0.0
+        # Hundredths rounded half-up in integers: a float quotient can land
+        # just under a .xx5 tie and round the wrong way
+        denominator = 2 * self._credits * DECIMAL_UNIT
+        hundredths = (200 * self._points + denominator // 2) // denominator
+        return max(0, min(hundredths, round(max_points * 100))) / 100
+
+
+def semester_totals(courses_list):
+    """Fresh SemesterTotals for one semester's course rows"""
+    if len(courses_list) >= COLUMNAR_MIN_ROWS:
+        return CourseTable.from_courses(courses_list).semester_totals()[0]
+    sem_totals = SemesterTotals()
+    for course in courses_list:
+        sem_totals.apply(course_contribution(course))
+    return sem_totals
+
+# ============================================================================
+# COLUMNAR COURSE TABLE - one vectorized pass, in the running totals' units
+# ============================================================================
+
+COLUMNAR_MIN_ROWS = 48  # below this a semester is cheaper to total row by row
+INT64_MAX = 2 ** 63 - 1
+
+
+def _to_unit_array(values):
+    # np.rint rounds half to even like round(), so this matches _to_units
+    return np.rint(np.asarray(values, dtype=np.float64) * DECIMAL_UNIT).astype(np.int64)
+
+
+def _group_sum(semester_ids, column, n):
+    """Exact per-semester sums of an int64 column, as Python ints"""
+    sums = np.zeros(n, dtype=np.int64)
+    np.add.at(sums, semester_ids, column)
+    return sums.tolist()
+
+
+class CourseTable:
+    """Columnar view of semesters_data: one array slot per course row"""
+
+    __slots__ = (
+        "semester_names",
+        "semester_ids",
+        "credit_units",
+        "grade_units",
+        "named",
+        "credit_ok",
+        "valid",
+    )
+
+    def __init__(self, semester_names, semester_ids, credit_units, grade_units,
+                 named, credit_ok, valid):
+        self.semester_names = semester_names
+        self.semester_ids = semester_ids
+        self.credit_units = credit_units
+        self.grade_units = grade_units
+        self.named = named
+        self.credit_ok = credit_ok
+        self.valid = valid
+
+    @classmethod
+    def from_semesters(cls, semesters_data):
+        """Flatten {semester name: [Course, ...]} into column arrays (non-list values skipped)"""
+        semester_names, counts, rows = [], [], []
+        for sem_name, courses_list in semesters_data.items():
+            if not isinstance(courses_list, list):
+                continue
+            size = len(rows)
+            for course in courses_list:
+                course = course if type(course) is Course else as_course(course)
+                if course is not None:
+                    rows.append(course)
+            semester_names.append(sem_name)
+            counts.append(len(rows) - size)
+
+        names, credit_values, grade_values = zip(*rows) if rows else ((), (), ())
+        # None (an unusable value) becomes NaN: not ok, and counted as 0 like _parse_course
+        credit_hours = np.array(credit_values, dtype=np.float64)
+        grade_points = np.array(grade_values, dtype=np.float64)
+        credit_ok = ~np.isnan(credit_hours)
+        grade_ok = ~np.isnan(grade_points)
+        credit_hours[~credit_ok] = 0.0
+        grade_points[~grade_ok] = 0.0
+        named = np.fromiter((name != "" for name in names), dtype=bool, count=len(names))
+        valid = named & credit_ok & grade_ok & (credit_hours > 0)
+
+        return cls(
+            semester_names,
+            np.repeat(np.arange(len(semester_names), dtype=np.intp), counts),
+            _to_unit_array(credit_hours),
+            _to_unit_array(grade_points),
+            named,
+            credit_ok,
+            valid,
+        )
+
+    @classmethod
+    def from_courses(cls, courses_list):
+        """Build a single-semester table from one courses list"""
+        return cls.from_semesters({None: list(courses_list)})
+
+    def __len__(self):
+        return len(self.semester_ids)
+
+    def semester_totals(self):
+        """SemesterTotals for every semester, in semester_names order"""
+        n = len(self.semester_names)
+        credits = np.where(self.valid, self.credit_units, 0)
+        grades = np.where(self.valid, self.grade_units, 0)
+        listed = np.where(self.named & self.credit_ok, self.credit_units, 0)
+
+        largest_credit = int(np.abs(listed).max(initial=0))
+        largest_grade = int(np.abs(grades).max(initial=0))
+        if largest_credit * max(largest_grade, 1) * len(self) <= INT64_MAX:
+            credit_sums, point_sums, listed_sums = (
+                _group_sum(self.semester_ids, column, n) for column in (credits, credits * grades, listed)
+            )
+        else:
+            # Values near MAX_ABS_VALUE: products could overflow int64, so sum Python ints
+            credit_sums, point_sums, listed_sums = ([0] * n for _ in range(3))
+            for sem_id, c, g, l in zip(self.semester_ids.tolist(), credits.tolist(), grades.tolist(), listed.tolist()):
+                credit_sums[sem_id] += c
+                point_sums[sem_id] += c * g
+                listed_sums[sem_id] += l
+
+        valid = np.bincount(self.semester_ids[self.valid], minlength=n).tolist()
+        named = np.bincount(self.semester_ids[self.named], minlength=n).tolist()
+        return [
+            SemesterTotals(*row) for row in zip(credit_sums, point_sums, valid, named, listed_sums)
+        ]
+
+# ============================================================================
+# SEMESTER MEMO - semesters seen before (in any session) skip the per-course parse
+# ============================================================================
+
+SEMESTER_CACHE_SIZE = 1024     # entries
+SEMESTER_CACHE_ROWS = 65536    # distinct course rows held across all keys (the memory cap)
+SEMESTER_CACHE_TTL = 3600.0    # seconds from store to expiry; None keeps entries until evicted
+
+
+class SemesterFingerprint:
+    """Hash-once key for a semester's contents.
+
+    Tuples don't cache their hash, and an LRU hit hashes its key twice
+    (lookup, then move_to_end), so the hash is computed here once. Equality
+    compares the full contents, so two different semesters never collide.
+    """
+
+    __slots__ = ("items", "_hash")
+
+    def __init__(self, items):
+        self.items = items
+        self._hash = hash(items)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, SemesterFingerprint) and self.items == other.items
+
+
+def semester_fingerprint(courses_list):
+    """SemesterFingerprint for courses_list, or None if a value is unhashable.
+
+    Course records are canonicalized first: a semester's totals depend only
+    on how often each (named?, credit_hours, grade_points) row occurs, so
+    the key drops course names and row order. Two students with the same
+    standard course load share one entry however they typed or sorted it.
+    """
+    if all(type(course) is Course for course in courses_list):
+        rows = collections.Counter(
+            (course.name != "", course.credit_hours, course.grade_points) for course in courses_list
+        )
+        return SemesterFingerprint(frozenset(rows.items()))
+    # Legacy dict rows: key on their items
+    items = tuple(tuple(course.items()) if isinstance(course, dict) else course for course in courses_list)
+    try:
+        return SemesterFingerprint(items)
+    except TypeError:
+        return None
+
+
+class SemesterCache:
+    """Bounded LRU of per-semester totals keyed by SemesterFingerprint.
+
+    Thread-safe so one instance can serve every session in a process.
+    Entries expire ttl seconds after they are stored, and the LRU end is
+    evicted past maxsize entries or max_rows key rows, whichever comes
+    first. hits/misses are kept for tuning the limits.
+    """
+
+    __slots__ = ("maxsize", "max_rows", "ttl", "hits", "misses", "expired", "rows",
+                 "_entries", "_lock", "_clock")
+
+    def __init__(self, maxsize=SEMESTER_CACHE_SIZE, max_rows=SEMESTER_CACHE_ROWS,
+                 ttl=SEMESTER_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.rows = 0
+        self._entries = collections.OrderedDict()  # {key: (delta, expires_at)}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def totals(self, courses_list):
+        """SemesterTotals for courses_list (a new object; safe to mutate)"""
+        key = semester_fingerprint(courses_list)
+        with self._lock:
+            sem_totals = self._lookup(key)
+        if sem_totals is not None:
+            return sem_totals
+
+        # Computed outside the lock: two sessions missing on the same key
+        # both compute it, which is cheaper than serializing every miss
+        sem_totals = semester_totals(courses_list)
+        with self._lock:
+            self._keep(key, sem_totals)
+        return sem_totals
+
+    def totals_many(self, courses_lists):
+        """SemesterTotals for each courses list; the misses share one columnar pass"""
+        keys = [semester_fingerprint(courses_list) for courses_list in courses_lists]
+        with self._lock:
+            results = [self._lookup(key) for key in keys]
+        missing = [i for i, sem_totals in enumerate(results) if sem_totals is None]
+        if missing:
+            table = CourseTable.from_semesters({i: courses_lists[i] for i in missing})
+            with self._lock:
+                for i, sem_totals in zip(missing, table.semester_totals()):
+                    results[i] = sem_totals
+                    self._keep(keys[i], sem_totals)
+        return results
+
+    def _lookup(self, key):
+        """Totals for key if held and fresh, else None; counts the hit or miss"""
+        entry = None if key is None else self._entries.get(key)
+        if entry is not None:
+            delta, expires_at = entry
+            if expires_at is None or self._clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return SemesterTotals(*delta)
+            self._drop(key)
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def _keep(self, key, sem_totals):
+        if key is not None and len(key.items) <= self.max_rows:
+            self._store(key, sem_totals.as_delta())
+
+    def _store(self, key, delta):
+        if key in self._entries:
+            self._drop(key)
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        self._entries[key] = (delta, expires_at)
+        self.rows += len(key.items)
+        while len(self._entries) > self.maxsize or self.rows > self.max_rows:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        del self._entries[key]
+        self.rows -= len(key.items)
+
+    def purge_expired(self):
+        """Drop every expired entry now (lookups only drop the ones they hit)"""
+        if self.ttl is None:
+            return 0
+        now = self._clock()
+        with self._lock:
+            stale = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for key in stale:
+                self._drop(key)
+            self.expired += len(stale)
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "rows": self.rows,
+                "max_rows": self.max_rows,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expired = self.rows = 0
+
+
+class RunningTotals:
+    """Per-semester aggregates kept in step with edits via O(1) deltas"""
+
+    __slots__ = ("semesters", "overall")
+
+    def __init__(self):
+        self.semesters = {}
+        self.overall = SemesterTotals()
+
+    @classmethod
+    def from_semesters(cls, semesters_data, cache=None):
+        """Full rebuild from semesters_data (session start, bulk loads).
+
+        Without a cache the whole transcript is one CourseTable pass. With a
+        SemesterCache, each semester is looked up by content first, so a
+        reload or import only parses the semesters that actually changed,
+        all of them in one pass.
+        """
+        totals = cls()
+        if cache is None:
+            table = CourseTable.from_semesters(semesters_data)
+            semesters = zip(table.semester_names, table.semester_totals())
+        else:
+            semester_names = [
+                sem_name for sem_name, courses_list in semesters_data.items() if isinstance(courses_list, list)
+            ]
+            semesters = zip(
+                semester_names, cache.totals_many([semesters_data[sem_name] for sem_name in semester_names])
+            )
+        for sem_name, sem_totals in semesters:
+            totals.semesters[sem_name] = sem_totals
+            totals.overall.apply(sem_totals.as_delta())
+        return totals
+
+    def semester(self, sem_name):
+        """Totals for one semester (empty totals if unknown)"""
+        return self.semesters.get(sem_name) or SemesterTotals()
+
+    def add_semester(self, sem_name, courses_list=()):
+        self.remove_semester(sem_name)
+        sem_totals = semester_totals(courses_list)
+        self.semesters[sem_name] = sem_totals
+        self.overall.apply(sem_totals.as_delta())
+
+    def remove_semester(self, sem_name):
+        sem_totals = self.semesters.pop(sem_name, None)
+        if sem_totals is not None:
+            self.overall.apply(sem_totals.as_delta(), sign=-1)
+
+    def set_semester_totals(self, sem_name, delta):
+        """Install already-known totals (e.g. from undo history) without re-parsing"""
+        self.remove_semester(sem_name)
+        self.semesters[sem_name] = SemesterTotals(*delta)
+        self.overall.apply(delta)
+
+    def update_course(self, sem_name, old_course, new_course):
+        """Swap one course's contribution; either side may be None"""
+        sem_totals = self.semesters.setdefault(sem_name, SemesterTotals())
+        for course, sign in ((old_course, -1), (new_course, 1)):
+            if course is None:
+                continue
+            delta = course_contribution(course)
+            sem_totals.apply(delta, sign)
+            self.overall.apply(delta, sign)
+
+    def semester_gpa(self, sem_name, max_points=MAX_GRADE_POINTS):
+        return self.semester(sem_name).gpa(max_points)
+
+    def cgpa(self, max_points=MAX_GRADE_POINTS):
+        return self.overall.gpa(max_points)
+
+# ============================================================================
+# PER-RERUN RESULTS
+# ============================================================================
+
+class SemesterSummary(NamedTuple):
+    name: str
+    gpa: float
+    courses: int
+    credits: float
+
+
+class GPAResults:
+    """Everything the page displays, computed once per rerun"""
+
+    __slots__ = ("cgpa", "semester_count", "total_courses", "total_credits", "semesters")
+
+    def __init__(self, cgpa, semester_count, total_courses, total_credits, semesters):
+        self.cgpa = cgpa
+        self.semester_count = semester_count
+        self.total_courses = total_courses
+        self.total_credits = total_credits
+        self.semesters = semesters
+
+    @classmethod
+    def from_totals(cls, semester_names, totals, max_points=MAX_GRADE_POINTS):
+        """Single walk over the semesters, reading cached running totals"""
+        semesters = {}
+        for sem_name in semester_names:
+            sem_totals = totals.semester(sem_name)
+            semesters[sem_name] = SemesterSummary(
+                sem_name,
+                sem_totals.gpa(max_points),
+                sem_totals.courses,
+                sem_totals.listed_credits,
+            )
+        return cls(
+            cgpa=totals.cgpa(max_points),
+            semester_count=len(semesters),
+            total_courses=totals.overall.courses,
+            total_credits=round(totals.overall.listed_credits, 1),
+            semesters=semesters,
+        )
+
+    @classmethod
+    def from_semesters(cls, semesters_data, max_points=MAX_GRADE_POINTS):
+        """Results straight from raw semesters_data (no session cache)"""
+        # Non-list semesters are skipped, as calculate_cgpa and the totals skip them
+        semester_names = [name for name, courses_list in semesters_data.items() if isinstance(courses_list, list)]
+        return cls.from_totals(semester_names, RunningTotals.from_semesters(semesters_data), max_points)
@@ -0,0 +1,112 @@
+"""Grading scales: letter grades and percentages → grade points.
+
+Each GradingScale builds its lookup tables once, at import: a dict from
+letter to points, and the ascending percentage-band floors with the points
+each band earns. A whole column of raw grades ("3.7", "B+", "87%") converts
+in one vectorized pass: numbers parse with pd.to_numeric, letters through
+the dict, and percentages land in their band via np.searchsorted (a
+vectorized bisect). No grade is handled by its own branch.
+
+Conversion happens once, where raw grades enter (file import). Stored
+courses hold grade points, and the metrics come from the GPA engine's
+columnar pass and running totals, with the scale only setting max_points.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+DEFAULT_SCALE = "4.0"
+
+
+class GradeLevel(NamedTuple):
+    letter: str
+    points: float
+
+
+class GradingScale:
+    """One scale's letters, percentage bands and input limits"""
+
+    __slots__ = ("key", "label", "max_points", "step", "levels", "letter_points", "band_floors", "band_points")
+
+    def __init__(self, key, label, max_points, levels=(), bands=(), step=0.1):
+        """bands are (lowest percentage, letter) pairs; none means points are the percentage"""
+        self.key = key
+        self.label = label
+        self.max_points = float(max_points)
+        self.step = step
+        self.levels = tuple(sorted(levels, key=lambda level: level.points, reverse=True))
+        self.letter_points = {level.letter.upper(): level.points for level in self.levels}
+        bands = sorted(bands)
+        self.band_floors = np.array([floor for floor, _ in bands], dtype=np.float64)
+        self.band_points = np.array([self.letter_points[letter.upper()] for _, letter in bands], dtype=np.float64)
+
+    def percent_to_points(self, percent):
+        """Points for an array of percentages; NaN outside 0–100"""
+        percent = np.asarray(percent, dtype=np.float64)
+        in_range = (percent >= 0) & (percent <= 100)
+        if not len(self.band_floors):
+            return np.where(in_range, percent, np.nan)
+        band = np.searchsorted(self.band_floors, percent, side="right") - 1
+        converted = self.band_points[np.clip(band, 0, None)]
+        return np.where(in_range & (band >= 0), converted, np.nan)
+
+    def to_points(self, values):
+        """Float array of grade points for raw grades; NaN where unusable"""
+        # Only imports need this: the app and the batch CLI load without pandas
+        import pandas as pd
+
+        raw = pd.Series(values, dtype=object)
+        text = raw.where(raw.notna(), "").astype(str).str.strip()
+        points = pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64)
+        if self.letter_points:
+            letters = text.str.upper().map(self.letter_points).to_numpy(dtype=np.float64)
+            points = np.where(np.isnan(points), letters, points)
+        is_percent = text.str.endswith("%").to_numpy(dtype=bool)
+        if is_percent.any():
+            percent = pd.to_numeric(text.str[:-1].str.strip(), errors="coerce").to_numpy(dtype=np.float64)
+            points = np.where(is_percent, self.percent_to_points(percent), points)
+        return points
+
+# ============================================================================
+# BUILT-IN SCALES
+# ============================================================================
+
+_US_LEVELS = [
+    GradeLevel("A", 4.0), GradeLevel("A-", 3.7), GradeLevel("B+", 3.3), GradeLevel("B", 3.0),
+    GradeLevel("B-", 2.7), GradeLevel("C+", 2.3), GradeLevel("C", 2.0), GradeLevel("C-", 1.7),
+    GradeLevel("D+", 1.3), GradeLevel("D", 1.0), GradeLevel("D-", 0.7), GradeLevel("F", 0.0),
+]
+_US_BANDS = [
+    (93, "A"), (90, "A-"), (87, "B+"), (83, "B"), (80, "B-"), (77, "C+"),
+    (73, "C"), (70, "C-"), (67, "D+"), (63, "D"), (60, "D-"), (0, "F"),
+]
+
+SCALES = {
+    scale.key: scale
+    for scale in (
+        GradingScale("4.0", "4.0 (A–F)", 4.0, _US_LEVELS, _US_BANDS),
+        GradingScale(
+            "4.3", "4.3 (A+ = 4.3)", 4.3,
+            [GradeLevel("A+", 4.3)] + _US_LEVELS,
+            [(97, "A+")] + _US_BANDS,
+        ),
+        GradingScale(
+            "5.0", "5.0 (A–F)", 5.0,
+            [GradeLevel("A", 5.0), GradeLevel("B", 4.0), GradeLevel("C", 3.0),
+             GradeLevel("D", 2.0), GradeLevel("E", 1.0), GradeLevel("F", 0.0)],
+            [(70, "A"), (60, "B"), (50, "C"), (45, "D"), (40, "E"), (0, "F")],
+        ),
+        GradingScale(
+            "10", "10-point (O–F)", 10.0,
+            [GradeLevel("O", 10.0), GradeLevel("A+", 9.0), GradeLevel("A", 8.0), GradeLevel("B+", 7.0),
+             GradeLevel("B", 6.0), GradeLevel("C", 5.0), GradeLevel("P", 4.0), GradeLevel("F", 0.0)],
+            [(90, "O"), (80, "A+"), (70, "A"), (60, "B+"), (50, "B"), (45, "C"), (40, "P"), (0, "F")],
+        ),
+        GradingScale("percent", "Percentage (0–100)", 100.0, step=1.0),
+    )
+}
+
+
+def get_scale(key):
+    """The scale for key, falling back to the default for unknown keys"""
+    return SCALES.get(key) or SCALES[DEFAULT_SCALE]
@@ -0,0 +1,83 @@
+"""Undo/redo for semesters_data and its running totals.
+
+A checkpoint is taken just before each mutation and holds only what that
+mutation is about to change: the semester order, plus a tuple of Course
+records and the cached totals for each touched semester. Course records
+are immutable, so checkpoints share them with the live state and with each
+other; a course edit costs one tuple of the edited semester, however large
+the rest of the transcript is. Restoring installs the saved totals directly,
+so undo never re-parses a course.
+"""
+import collections
+from typing import NamedTuple
+
+HISTORY_DEPTH = 50
+
+
+class Checkpoint(NamedTuple):
+    label: str
+    order: tuple      # semester names, in display order
+    semesters: dict   # {sem_name: (courses tuple, totals delta)} for touched semesters
+
+
+def _capture(label, semesters_data, totals, touched):
+    saved = {}
+    for sem_name in touched:
+        courses_list = semesters_data.get(sem_name)
+        if courses_list is not None:
+            saved[sem_name] = (tuple(courses_list), totals.semester(sem_name).as_delta())
+    return Checkpoint(label, tuple(semesters_data), saved)
+
+
+def _restore(checkpoint, semesters_data, totals):
+    """Put semesters_data and totals (both mutated in place) back to checkpoint"""
+    keep = set(checkpoint.order)
+    for sem_name in list(semesters_data):
+        if sem_name not in keep:
+            del semesters_data[sem_name]
+            totals.remove_semester(sem_name)
+    for sem_name, (courses, delta) in checkpoint.semesters.items():
+        semesters_data[sem_name] = list(courses)
+        totals.set_semester_totals(sem_name, delta)
+    reordered = {sem_name: semesters_data[sem_name] for sem_name in checkpoint.order}
+    semesters_data.clear()
+    semesters_data.update(reordered)
+
+
+class History:
+    """Bounded undo stack plus the redo stack it feeds"""
+
+    def __init__(self, depth=HISTORY_DEPTH):
+        self._undo = collections.deque(maxlen=depth)
+        self._redo = []
+
+    def record(self, label, semesters_data, totals, touched=None):
+        """Call before a mutation; touched=None means every semester may change"""
+        if touched is None:
+            touched = list(semesters_data)
+        self._undo.append(_capture(label, semesters_data, totals, touched))
+        self._redo.clear()
+
+    def _swap(self, source, target, semesters_data, totals):
+        if not source:
+            return None
+        checkpoint = source.pop()
+        # What the restore will overwrite or drop, so the opposite stack can bring it back
+        touched = set(checkpoint.semesters).union(
+            sem_name for sem_name in semesters_data if sem_name not in checkpoint.order
+        )
+        target.append(_capture(checkpoint.label, semesters_data, totals, touched))
+        _restore(checkpoint, semesters_data, totals)
+        return checkpoint
+
+    def undo(self, semesters_data, totals):
+        """Step back once; returns the Checkpoint restored, or None"""
+        return self._swap(self._undo, self._redo, semesters_data, totals)
+
+    def redo(self, semesters_data, totals):
+        """Re-apply the last undone action; returns the Checkpoint restored, or None"""
+        return self._swap(self._redo, self._undo, semesters_data, totals)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,181 @@
+"""Opt-in per-rerun timing for app.py.
+
+Each script run (full rerun or fragment rerun) gets a RunTimer that adds up
+wall time per named section, counts the widgets the run registered, and
+measures the CPU time of the session thread that ran it.
+Top-level blocks are timed as laps (time since the previous lap), so the
+laps of a run add up to its total; ``section()`` times a nested block and
+is named "lap/part" by convention.
+Finished runs go into a process-wide PerfRecorder that keeps a rolling
+window per section for the p50/p95 panel, and, if CGPA_PERF_LOG is set,
+are appended as one JSON object per line (path, or "-" for stderr).
+
+Enable with ``?perf=1`` in the URL or ``CGPA_PERF=1`` in the environment.
+When disabled the app gets a NullTimer whose sections cost nothing.
+"""
+import collections
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+PERF_ENV = "CGPA_PERF"
+PERF_LOG_ENV = "CGPA_PERF_LOG"
+PERF_QUERY_PARAM = "perf"
+WINDOW = 200  # runs kept per section for the percentiles
+
+logger = logging.getLogger("cgpa.perf")
+
+
+def enabled(query_params):
+    if os.environ.get(PERF_ENV, "") not in ("", "0"):
+        return True
+    return query_params.get(PERF_QUERY_PARAM, "") not in ("", "0")
+
+
+def _widget_count():
+    """Widgets registered so far in this script run (None outside Streamlit)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    # 1.4x+ keeps the set on ctx.shared; older releases kept it on ctx
+    shared = getattr(ctx, "shared", ctx)
+    widget_ids = getattr(shared, "widget_ids_this_run", None)
+    if widget_ids is None:
+        return None
+    if hasattr(widget_ids, "snapshot"):
+        widget_ids = widget_ids.snapshot()
+    return len(widget_ids)
+
+# ============================================================================
+# PER-RUN TIMERS
+# ============================================================================
+
+class RunTimer:
+    """Section timings and widget count for one script or fragment run"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.sections = collections.defaultdict(float)
+        self.started = self._last_lap = time.perf_counter()
+        # Streamlit runs each session's script on its own thread, so thread
+        # CPU is this run's own work, not other sessions'
+        self.cpu_started = time.thread_time()
+        self.widgets_at_start = _widget_count() or 0
+
+    def lap(self, name):
+        """Charge the time since the previous lap to `name`"""
+        now = time.perf_counter()
+        self.sections[name] += now - self._last_lap
+        self._last_lap = now
+
+    @contextlib.contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] += time.perf_counter() - start
+
+    def finish(self, recorder, session_id=None):
+        widgets = _widget_count()
+        record = {
+            "ts": time.time(),
+            "session": session_id,
+            "kind": self.kind,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "cpu_ms": round((time.thread_time() - self.cpu_started) * 1000, 3),
+            "sections_ms": {name: round(seconds * 1000, 3) for name, seconds in self.sections.items()},
+            "widgets": None if widgets is None else widgets - self.widgets_at_start,
+        }
+        recorder.record(record)
+        return record
+
+
+class NullTimer:
+    """Stand-in used when instrumentation is off"""
+
+    kind = None
+
+    def lap(self, name):
+        pass
+
+    def section(self, name):
+        return contextlib.nullcontext()
+
+    def finish(self, recorder=None, session_id=None):
+        return None
+
+
+NULL_TIMER = NullTimer()
+
+
+def start_run(kind, is_enabled):
+    return RunTimer(kind) if is_enabled else NULL_TIMER
+
+# ============================================================================
+# PROCESS-WIDE ROLLING STATS
+# ============================================================================
+
+class PerfRecorder:
+    """Rolling per-section samples shared by every session in the process"""
+
+    def __init__(self, window=WINDOW, log_path=None):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+        if log_path is None:
+            log_path = os.environ.get(PERF_LOG_ENV)
+        self._log = _json_logger(log_path) if log_path else None
+
+    def _add(self, key, value):
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = collections.deque(maxlen=self.window)
+        samples.append(value)
+
+    def record(self, record):
+        kind = record["kind"]
+        with self._lock:
+            self._add((kind, "total"), record["total_ms"])
+            self._add((kind, "cpu"), record["cpu_ms"])
+            for name, ms in record["sections_ms"].items():
+                self._add((kind, name), ms)
+            if record["widgets"] is not None:
+                self._add((kind, "widgets"), record["widgets"])
+        if self._log is not None:
+            self._log.info(json.dumps(record, separators=(",", ":")))
+
+    def summary(self):
+        """Rows of (run kind, section, p50, p95, samples); 'widgets' rows are counts, not ms"""
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+        rows = []
+        for (kind, name), samples in sorted(snapshot.items()):
+            p50, p95 = np.percentile(samples, [50, 95])
+            rows.append((kind, name, float(p50), float(p95), len(samples)))
+        return rows
+
+
+def _json_logger(log_path):
+    """A dedicated logger writing bare JSON lines, so records stay parseable"""
+    json_log = logger.getChild("json")
+    json_log.setLevel(logging.INFO)
+    json_log.propagate = False
+    if not json_log.handlers:
+        if log_path == "-":
+            handler = logging.StreamHandler(sys.stderr)
+        else:
+            handler = logging.FileHandler(log_path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        json_log.addHandler(handler)
+    return json_log
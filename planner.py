@@ -0,0 +1,149 @@
+"""Target-CGPA planner.
+
+Works from the cumulative totals the app already keeps (Σcredits and
+Σcredits×points of the GPA-counted courses). The GPA needed over some
+planned credits has a closed form:
+
+    required = (target × (C + c) − P) / c
+
+Grade combinations for individual planned courses come from a depth-first
+search that only emits *minimal* combinations (no single course could drop
+a letter and still reach the target), pruned by two bounds:
+
+* the best grades left can no longer reach the target, and
+* the points already placed exceed the target by more than one chosen
+  course's next-lower step, so that course could be lowered.
+
+Both prunes cut whole subtrees, so 8 courses × 12 letter levels finishes in
+milliseconds instead of walking 12**8 permutations.
+"""
+from typing import NamedTuple
+
+from gpa_engine import MAX_GRADE_POINTS, clamp_gpa
+from grading import DEFAULT_SCALE, get_scale
+
+EPSILON = 1e-9  # float slack when comparing point sums against the target
+DEFAULT_LIMIT = 20
+DEFAULT_LEVELS = get_scale(DEFAULT_SCALE).levels
+
+
+class TargetPlan(NamedTuple):
+    target: float
+    planned_credits: float
+    required_gpa: float  # over the planned credits; <= 0 means any grades do
+    feasible: bool
+    best_cgpa: float     # CGPA if every planned credit earns max_points
+
+
+class GradeCombination(NamedTuple):
+    grades: tuple        # one GradeLevel per planned course, in input order
+    term_gpa: float
+    cgpa: float
+
+# ============================================================================
+# CLOSED FORM
+# ============================================================================
+
+def required_gpa(current_credits, current_points, planned_credits, target):
+    """GPA needed over planned_credits for the CGPA to reach target"""
+    if planned_credits <= 0:
+        raise ValueError("planned_credits must be positive")
+    return (target * (current_credits + planned_credits) - current_points) / planned_credits
+
+
+def plan_for_target(current_credits, current_points, planned_credits, target, max_points=MAX_GRADE_POINTS):
+    required = required_gpa(current_credits, current_points, planned_credits, target)
+    best_total_credits = current_credits + planned_credits
+    best_cgpa = clamp_gpa((current_points + planned_credits * max_points) / best_total_credits, max_points)
+    return TargetPlan(
+        target=target,
+        planned_credits=planned_credits,
+        required_gpa=required,
+        feasible=required <= max_points + EPSILON,
+        best_cgpa=best_cgpa,
+    )
+
+# ============================================================================
+# BOUNDED SEARCH
+# ============================================================================
+
+def _distinct_levels(levels):
+    """Levels sorted high → low with duplicate point values dropped"""
+    seen = set()
+    distinct = []
+    for level in sorted(levels, key=lambda level: level.points, reverse=True):
+        if level.points not in seen:
+            seen.add(level.points)
+            distinct.append(level)
+    return distinct
+
+
+def grade_combinations(current_credits, current_points, planned_credits, target,
+                       levels=DEFAULT_LEVELS, limit=DEFAULT_LIMIT, max_points=MAX_GRADE_POINTS):
+    """Minimal grade combinations for planned courses that reach target.
+
+    planned_credits is a list of credit hours, one per planned course.
+    Returns (combinations, truncated); truncated is True when the search
+    stopped at `limit` with more combinations left.
+    """
+    levels = _distinct_levels(levels)
+    credits = [float(c) for c in planned_credits]
+    if not credits or not levels or any(c <= 0 for c in credits):
+        return [], False
+
+    planned_total = sum(credits)
+    total_credits = current_credits + planned_total
+    needed = target * total_credits - current_points  # points the planned courses must add
+
+    # Search big courses first: their choices move the sum most, so bounds bite early
+    order = sorted(range(len(credits)), key=lambda i: credits[i], reverse=True)
+    ordered_credits = [credits[i] for i in order]
+    top, bottom = levels[0].points, levels[-1].points
+    # best_after[k]: most points courses k.. can still add
+    best_after = [0.0] * (len(order) + 1)
+    for k in range(len(order) - 1, -1, -1):
+        best_after[k] = best_after[k + 1] + ordered_credits[k] * top
+    floor_after = [0.0] * (len(order) + 1)
+    for k in range(len(order) - 1, -1, -1):
+        floor_after[k] = floor_after[k + 1] + ordered_credits[k] * bottom
+    # steps[j]: points lost by lowering level j to level j + 1
+    steps = [levels[j].points - levels[j + 1].points for j in range(len(levels) - 1)] + [float("inf")]
+    # Try grades nearest the closed-form average first, so the first
+    # `limit` results are the evenly spread ones rather than "all A, one F"
+    average = needed / planned_total
+    preferred = sorted(range(len(levels)), key=lambda j: (abs(levels[j].points - average), j))
+
+    results = []
+    chosen = [0] * len(order)
+    truncated = False
+
+    def visit(k, points, slack_cap):
+        nonlocal truncated
+        if points + best_after[k] < needed - EPSILON:
+            return True  # can't reach the target from here
+        # Even the lowest remaining grades leave room to lower an earlier course
+        if points + floor_after[k] - needed >= slack_cap - EPSILON:
+            return True
+        if k == len(order):
+            if len(results) >= limit:
+                truncated = True
+                return False
+            grades = [None] * len(order)
+            for position, course_idx in enumerate(order):
+                grades[course_idx] = levels[chosen[position]]
+            results.append(GradeCombination(
+                grades=tuple(grades),
+                term_gpa=clamp_gpa(points / planned_total, max_points),
+                cgpa=clamp_gpa((current_points + points) / total_credits, max_points),
+            ))
+            return True
+        course_credits = ordered_credits[k]
+        for j in preferred:
+            chosen[k] = j
+            cap = min(slack_cap, course_credits * steps[j])
+            if not visit(k + 1, points + course_credits * levels[j].points, cap):
+                return False
+        return True
+
+    visit(0, 0.0, float("inf"))
+    return results, truncated
@@ -0,0 +1,399 @@
+"""SQLite persistence for semesters_data as an append-only event log.
+
+Every edit is stored as one small event (add courses, edit a course,
+delete a semester, ...), so a save writes bytes proportional to the change,
+not to the transcript. Every SNAPSHOT_EVERY events the log is compacted
+into a full snapshot of the semesters/courses tables; loading a transcript
+reads that snapshot and replays only the events after it. Events are never
+deleted, so the log doubles as an audit trail.
+
+Transcripts live in one local SQLite file opened in WAL mode, so readers
+never block the writer. Sessions don't write directly: they append events
+to a shared write-behind queue that one writer thread flushes, every
+pending event in a single transaction. Hundreds of sessions therefore cost
+one short lock each per edit and never contend for the database lock.
+Sequence numbers are assigned inside the writing transaction, so several
+server processes can share one file. A batch that fails to write goes
+back on the queue and is retried with backoff; until a write succeeds,
+write_error says why.
+
+A separate students table indexes transcripts by advisor workspace, so a
+workspace lists its students without loading any transcript.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from gpa_engine import Course
+
+DEFAULT_DB_PATH = os.environ.get("CGPA_DB_PATH", "cgpa_data.sqlite3")
+FLUSH_INTERVAL = 0.5  # seconds between write-behind batches
+SNAPSHOT_EVERY = 100  # events between compacted snapshots
+RETRY_DELAY = 1.0  # seconds before a failed batch is retried, doubling per failure
+MAX_RETRY_DELAY = 30.0
+
+logger = logging.getLogger("cgpa.storage")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    transcript_id TEXT PRIMARY KEY,
+    updated_at    REAL NOT NULL,
+    snapshot_seq  INTEGER NOT NULL DEFAULT 0,
+    last_seq      INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    transcript_id TEXT NOT NULL,
+    position      INTEGER NOT NULL,
+    name          TEXT NOT NULL,
+    PRIMARY KEY (transcript_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS courses (
+    transcript_id     TEXT NOT NULL,
+    semester_position INTEGER NOT NULL,
+    position          INTEGER NOT NULL,
+    name              TEXT NOT NULL,
+    credit_hours      REAL,
+    grade_points      REAL,
+    PRIMARY KEY (transcript_id, semester_position, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    transcript_id TEXT NOT NULL,
+    seq           INTEGER NOT NULL,
+    created_at    REAL NOT NULL,
+    op            TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    PRIMARY KEY (transcript_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS students (
+    workspace_id  TEXT NOT NULL,
+    transcript_id TEXT NOT NULL,
+    name          TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    PRIMARY KEY (workspace_id, transcript_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_transcripts_updated_at ON transcripts (updated_at);
+"""
+
+# Columns added to transcripts since the first schema; old files gain them on open
+MIGRATIONS = {
+    "snapshot_seq": "ALTER TABLE transcripts ADD COLUMN snapshot_seq INTEGER NOT NULL DEFAULT 0",
+    "last_seq": "ALTER TABLE transcripts ADD COLUMN last_seq INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class StudentRecord(NamedTuple):
+    transcript_id: str
+    name: str
+    created_at: float
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def _migrate(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(transcripts)")}
+    with conn:
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+
+# ============================================================================
+# EVENTS - {"op": ..., **fields}; courses travel as [name, credit_hours, grade_points]
+# ============================================================================
+
+def _courses(rows):
+    return [Course(*row) for row in rows]
+
+
+def apply_event(semesters_data, event):
+    """Apply one logged edit to semesters_data in place"""
+    op = event["op"]
+    if op == "set_semester":
+        semesters_data[event["semester"]] = _courses(event["courses"])
+    elif op == "delete_semester":
+        semesters_data.pop(event["semester"], None)
+    elif op == "add_courses":
+        semesters_data.setdefault(event["semester"], []).extend(_courses(event["courses"]))
+    elif op == "edit_course":
+        semesters_data[event["semester"]][event["index"]] = Course(*event["course"])
+    elif op == "delete_course":
+        semesters_data[event["semester"]].pop(event["index"])
+    elif op == "reset":
+        semesters_data.clear()
+    elif op == "restore":
+        # Undo/redo: the listed semesters' contents plus the full semester order
+        restored = {name: _courses(rows) for name, rows in event["semesters"].items()}
+        reordered = {
+            name: restored[name] if name in restored else semesters_data[name]
+            for name in event["order"]
+        }
+        semesters_data.clear()
+        semesters_data.update(reordered)
+    else:
+        raise ValueError(f"unknown event op {op!r}")
+
+
+class TranscriptStore:
+    """SQLite event log with write-behind batches and snapshots"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, flush_interval=FLUSH_INTERVAL, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._local = threading.local()
+        self._pending = {}   # {transcript_id: [(created_at, op, payload), ...]}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.write_error = None  # why the last write failed; None once one succeeds
+
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="cgpa-write-behind", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def _replay(self, conn, transcript_id):
+        """(semesters_data, last seq applied) from the snapshot plus later events"""
+        row = conn.execute(
+            "SELECT snapshot_seq FROM transcripts WHERE transcript_id = ?", (transcript_id,)
+        ).fetchone()
+        last_seq = row[0] if row else 0
+
+        semesters_data = {}
+        names = {}
+        for position, name in conn.execute(
+            "SELECT position, name FROM semesters WHERE transcript_id = ? ORDER BY position",
+            (transcript_id,),
+        ):
+            names[position] = name
+            semesters_data[name] = []
+        for sem_position, name, credit_hours, grade_points in conn.execute(
+            "SELECT semester_position, name, credit_hours, grade_points FROM courses "
+            "WHERE transcript_id = ? ORDER BY semester_position, position",
+            (transcript_id,),
+        ):
+            # Rows were written from Course records: NULL is an unusable value, not a blank one
+            semesters_data[names[sem_position]].append(Course(name, credit_hours, grade_points))
+
+        for seq, payload in conn.execute(
+            "SELECT seq, payload FROM events WHERE transcript_id = ? AND seq > ? ORDER BY seq",
+            (transcript_id, last_seq),
+        ):
+            apply_event(semesters_data, json.loads(payload))
+            last_seq = seq
+        return semesters_data, last_seq
+
+    def load(self, transcript_id):
+        """Return the stored semesters_data for transcript_id ({} if unknown)"""
+        # No flush can run in between, so every event is either in this copy
+        # of the queue or committed before the read, never both
+        with self._flush_lock:
+            with self._lock:
+                unflushed = list(self._pending.get(transcript_id, []))
+            conn = self._reader()
+            conn.execute("BEGIN")  # one read snapshot for the snapshot tables and the log
+            try:
+                semesters_data, _ = self._replay(conn, transcript_id)
+            finally:
+                conn.execute("COMMIT")
+        for _, _, payload in unflushed:
+            apply_event(semesters_data, json.loads(payload))
+        return semesters_data
+
+    def events(self, transcript_id, since=0):
+        """Flushed events after seq `since`, oldest first: the audit trail"""
+        return [
+            {"seq": seq, "created_at": created_at, **json.loads(payload)}
+            for seq, created_at, payload in self._reader().execute(
+                "SELECT seq, created_at, payload FROM events "
+                "WHERE transcript_id = ? AND seq > ? ORDER BY seq",
+                (transcript_id, since),
+            )
+        ]
+
+    # ------------------------------------------------------------------
+    # Student index - rare, tiny writes, so they skip the write-behind queue
+    # ------------------------------------------------------------------
+
+    def students(self, workspace_id):
+        """The workspace's students, oldest first; no transcript is read"""
+        return [
+            StudentRecord(*row)
+            for row in self._reader().execute(
+                "SELECT transcript_id, name, created_at FROM students "
+                "WHERE workspace_id = ? ORDER BY created_at, transcript_id",
+                (workspace_id,),
+            )
+        ]
+
+    def add_student(self, workspace_id, transcript_id, name):
+        record = StudentRecord(transcript_id, name, time.time())
+        conn = self._reader()
+        with conn:
+            conn.execute(
+                "INSERT INTO students VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (workspace_id, transcript_id) DO UPDATE SET name = excluded.name",
+                (workspace_id, *record),
+            )
+        return record
+
+    def rename_student(self, workspace_id, transcript_id, name):
+        conn = self._reader()
+        with conn:
+            conn.execute(
+                "UPDATE students SET name = ? WHERE workspace_id = ? AND transcript_id = ?",
+                (name, workspace_id, transcript_id),
+            )
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+
+    def append(self, transcript_id, op, **fields):
+        """Queue one edit; it is serialized now, so later mutations can't leak in.
+
+        Its seq is given when the batch is written, not here.
+        """
+        payload = json.dumps({"op": op, **fields}, separators=(",", ":"), ensure_ascii=False)
+        created_at = time.time()
+        with self._lock:
+            self._pending.setdefault(transcript_id, []).append((created_at, op, payload))
+        self._wakeup.set()
+
+    @property
+    def unsaved(self):
+        """Events queued or being written but not yet committed"""
+        with self._lock:
+            return sum(len(events) for events in (*self._inflight.values(), *self._pending.values()))
+
+    def flush(self):
+        """Write every pending event in one transaction.
+
+        On failure the batch goes back ahead of anything queued since, so
+        nothing is lost and the order holds, and the exception propagates.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                self._write_batch(batch)
+            except Exception as exc:
+                with self._lock:
+                    for transcript_id, events in self._pending.items():
+                        batch.setdefault(transcript_id, []).extend(events)
+                    self._pending = batch
+                    self._inflight = {}
+                self.write_error = f"{type(exc).__name__}: {exc}"
+                raise
+            with self._lock:
+                self._inflight = {}
+            self.write_error = None
+            return len(batch)
+
+    def _write_batch(self, batch):
+        conn = self._reader()
+        with conn:
+            # Take the write lock before reading the newest seqs, so another
+            # process's writer can't hand out the same ones
+            conn.execute("BEGIN IMMEDIATE")
+            event_rows, transcript_rows = [], []
+            now = time.time()
+            for transcript_id, events in batch.items():
+                (seq,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM events WHERE transcript_id = ?", (transcript_id,)
+                ).fetchone()
+                for created_at, op, payload in events:
+                    seq += 1
+                    event_rows.append((transcript_id, seq, created_at, op, payload))
+                transcript_rows.append((transcript_id, now, seq))
+            conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", event_rows)
+            conn.executemany(
+                "INSERT INTO transcripts (transcript_id, updated_at, last_seq) VALUES (?, ?, ?) "
+                "ON CONFLICT (transcript_id) DO UPDATE SET "
+                "updated_at = excluded.updated_at, last_seq = excluded.last_seq",
+                transcript_rows,
+            )
+            due = [
+                transcript_id
+                for transcript_id, last_seq, snapshot_seq in conn.execute(
+                    f"SELECT transcript_id, last_seq, snapshot_seq FROM transcripts "
+                    f"WHERE transcript_id IN ({','.join('?' * len(batch))})",
+                    list(batch),
+                )
+                if last_seq - snapshot_seq >= self.snapshot_every
+            ]
+            for transcript_id in due:
+                self._write_snapshot(conn, transcript_id)
+
+    def _write_snapshot(self, conn, transcript_id):
+        """Compact the log: store the replayed state as the new snapshot"""
+        semesters_data, last_seq = self._replay(conn, transcript_id)
+        semester_rows, course_rows = [], []
+        for sem_position, (sem_name, courses_list) in enumerate(semesters_data.items()):
+            semester_rows.append((transcript_id, sem_position, sem_name))
+            for position, course in enumerate(courses_list):
+                course_rows.append((transcript_id, sem_position, position, *course))
+        conn.execute("DELETE FROM courses WHERE transcript_id = ?", (transcript_id,))
+        conn.execute("DELETE FROM semesters WHERE transcript_id = ?", (transcript_id,))
+        conn.executemany("INSERT INTO semesters VALUES (?, ?, ?)", semester_rows)
+        conn.executemany("INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?)", course_rows)
+        conn.execute(
+            "UPDATE transcripts SET snapshot_seq = ? WHERE transcript_id = ?", (last_seq, transcript_id)
+        )
+
+    def _write_loop(self):
+        retry_delay = RETRY_DELAY
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # Let further edits pile up so one transaction covers them all
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                # The thread must outlive a bad write: the batch is queued
+                # again, so back off and retry it
+                logger.exception("write-behind flush failed, retrying in %.1f s", retry_delay)
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+                self._wakeup.set()
+            else:
+                retry_delay = RETRY_DELAY
+
+    def close(self):
+        """Flush outstanding writes; safe to call more than once"""
+        self._closed = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("could not write %d event(s) on close", self.unsaved)
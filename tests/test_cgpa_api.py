@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from cgpa_api import serve_connection
+
+
+async def exchange(raw):
+    """Send one raw request to serve_connection; return (status, JSON body)"""
+    server = await asyncio.start_server(serve_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def post(path, payload, length=None):
+    body = json.dumps(payload).encode()
+    length = len(body) if length is None else length
+    raw = (f"POST {path} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+           f"Content-Length: {length}\r\n\r\n").encode() + body
+    return asyncio.run(exchange(raw))
+
+
+def test_summary():
+    status, result = post("/v1/summary", {"student_id": "s1", "semesters": {"S": [
+        {"Course Name": "A", "Credit Hours": 3, "Grade Points": 4},
+        {"Course Name": "B", "Credit Hours": 1, "Grade Points": 2},
+    ]}})
+    assert status == 200
+    assert result["cgpa"] == 3.5
+
+
+def test_negative_content_length_is_a_client_error():
+    status, result = post("/v1/summary", {"semesters": {}}, length=-5)
+    assert status == 400
+    assert "Content-Length" in result["error"]
+
+
+@pytest.mark.parametrize("scale", [["4.0"], {"a": 1}, 4.0, None])
+def test_non_string_scale_is_a_client_error(scale):
+    status, result = post("/v1/summary", {"semesters": {}, "scale": scale})
+    assert status == 400
+    assert "scale" in result["error"]
+
+
+def test_non_list_semesters_are_skipped():
+    semesters = {"S": [{"Course Name": "A", "Credit Hours": 3, "Grade Points": 4}], "T": "notalist", "U": 7}
+    status, result = post("/v1/summary", {"semesters": semesters})
+    assert status == 200
+    assert result == post("/v1/summary", {"semesters": {"S": semesters["S"]}})[1]
+
+    status, batch = post("/v1/batch", {"transcripts": [{"student_id": "1", "semesters": semesters}]})
+    assert status == 200
+    assert batch["results"] == [result | {"student_id": "1"}]
@@ -0,0 +1,50 @@
+import io
+import json
+
+import pytest
+
+import cgpa_batch
+from cgpa_batch import read_csv_transcripts
+
+HEADER = "Student ID,Semester,Course Name,Credit Hours,Grade Points\n"
+ROWS = "s1,Fall,Physics,3,4\ns1,Fall,Art,2,3\ns2,Fall,Physics,3,2\n"
+
+
+def test_bom_header_keeps_students_apart():
+    transcripts = list(read_csv_transcripts(io.StringIO("\ufeff" + HEADER + ROWS)))
+    assert [student_id for student_id, _ in transcripts] == ["s1", "s2"]
+    assert len(transcripts[0][1]["Fall"]) == 2
+
+
+@pytest.mark.parametrize("header", [
+    "Student,Semester,Course Name,Credit Hours,Grade Points\n",
+    "Student ID,Semester,Course Name,Credits,Grade Points\n",
+    "",
+])
+def test_missing_columns_are_rejected(header):
+    with pytest.raises(ValueError, match="missing"):
+        list(read_csv_transcripts(io.StringIO(header + ROWS)))
+
+
+def test_main_reads_a_bom_file(tmp_path):
+    source = tmp_path / "cohort.csv"
+    source.write_bytes((HEADER + ROWS).encode("utf-8-sig"))
+    output = tmp_path / "results.jsonl"
+    cgpa_batch.main([str(source), "-o", str(output), "--workers", "1"])
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [(result["student_id"], result["cgpa"]) for result in results] == [("s1", 3.6), ("s2", 2.0)]
+
+
+def test_main_reports_a_bad_header(tmp_path):
+    source = tmp_path / "cohort.csv"
+    source.write_text("Name,Grade\nx,4\n", encoding="utf-8")
+    with pytest.raises(SystemExit, match="missing Student ID"):
+        cgpa_batch.main([str(source), "-o", str(tmp_path / "out.jsonl"), "--workers", "1"])
+
+
+@pytest.mark.parametrize("line", ['[1, 2]', '"text"', '{"student_id": "s1", "semesters": []}'])
+def test_jsonl_non_object_lines_are_rejected(tmp_path, line):
+    source = tmp_path / "bad.jsonl"
+    source.write_text('{"student_id": "s0", "semesters": {}}\n' + line + "\n", encoding="utf-8")
+    with pytest.raises(SystemExit, match="line 2"):
+        cgpa_batch.main([str(source), "-o", str(tmp_path / "out.jsonl"), "--workers", "1"])
@@ -0,0 +1,45 @@
+import random
+
+from cgpa_batch import summarize
+from cohort import CohortStats, cohort_cgpa
+from gpa_engine import GPAResults, RunningTotals, SemesterCache, as_course
+
+
+def random_transcript(rng):
+    return {
+        f"Semester {sem}": [
+            {
+                "Course Name": "" if rng.random() < 0.1 else f"Course {course}",
+                "Credit Hours": rng.choice(["", "0", "0.5", "1.5", "2", "3", "3.5", "x"]),
+                "Grade Points": rng.choice(["", "0.1", "0.2", "0.5", "0.7", "2.35", "3.3", "4"]),
+            }
+            for course in range(rng.randint(0, 6))
+        ]
+        for sem in range(1, rng.randint(1, 4) + 1)
+    }
+
+
+def app_cgpa(semesters_data, max_points):
+    """What the app ranks: GPAResults over totals built from Course rows"""
+    parsed = {name: [as_course(row) for row in rows] for name, rows in semesters_data.items()}
+    totals = RunningTotals.from_semesters(parsed, cache=SemesterCache())
+    return GPAResults.from_totals(parsed, totals, max_points).cgpa
+
+
+def test_cohort_app_and_batch_agree():
+    rng = random.Random(7)
+    for _ in range(2000):
+        semesters_data = random_transcript(rng)
+        for max_points in (4.0, 5.0):
+            expected = summarize("s", semesters_data, max_points)["cgpa"]
+            assert cohort_cgpa(semesters_data, max_points) == expected
+            assert app_cgpa(semesters_data, max_points) == expected
+
+
+def test_tie_ranks_the_same_everywhere():
+    rows = [("A", 0.5, 3.3), ("B", 1.5, 0.2), ("C", 2.5, 0.7), ("D", 3.5, 0.5), ("E", 2, 0.1)]
+    semesters_data = {"S": [{"Course Name": n, "Credit Hours": c, "Grade Points": g} for n, c, g in rows]}
+    stats = CohortStats.from_transcripts([("tie", semesters_data), ("other", {"S": []})])
+    cgpa = app_cgpa(semesters_data, 4.0)
+    assert cgpa == 0.57
+    assert stats.student("tie") == stats.position(cgpa) == (0.57, 1, 100.0)
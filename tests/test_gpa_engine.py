@@ -0,0 +1,279 @@
+import random
+import threading
+from fractions import Fraction
+
+import pytest
+
+from gpa_engine import (
+    Course, CourseTable, RunningTotals, SemesterCache, SemesterTotals, course_contribution, semester_totals,
+)
+
+
+def baseline_cgpa(semesters_data, max_points=4.0):
+    """The original app's float loop over legacy dict rows"""
+    total_credits = 0.0
+    total_points = 0.0
+    for courses_list in semesters_data.values():
+        if not isinstance(courses_list, list):
+            continue
+        for course in courses_list:
+            if not str(course.get("Course Name", "")).strip():
+                continue
+            credit_hours = float(course.get("Credit Hours") or 0)
+            grade_points = float(course.get("Grade Points") or 0)
+            if credit_hours > 0:
+                total_credits += credit_hours
+                total_points += credit_hours * grade_points
+    if total_credits == 0:
+        return 0.0
+    return round(max(0.0, min(total_points / total_credits, max_points)), 2)
+
+
+def exact_quotient(semesters_data):
+    """The decimal Σ(credits × points) / Σcredits, or None without credits"""
+    credits = points = Fraction(0)
+    for courses_list in semesters_data.values():
+        for course in courses_list:
+            credit_hours = Fraction(str(course["Credit Hours"]))
+            if course["Course Name"] and credit_hours > 0:
+                credits += credit_hours
+                points += credit_hours * Fraction(str(course["Grade Points"]))
+    return points / credits if credits else None
+
+
+def random_transcript(rng):
+    return {
+        f"Semester {sem}": [
+            {
+                "Course Name": rng.choice(["", "Course"]) if rng.random() < 0.1 else "Course",
+                "Credit Hours": rng.choice([0, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4]),
+                "Grade Points": round(rng.uniform(0, 4), rng.choice([1, 2])),
+            }
+            for _ in range(rng.randint(1, 7))
+        ]
+        for sem in range(1, rng.randint(1, 4) + 1)
+    }
+
+
+def engine_cgpa(semesters_data):
+    parsed = {name: [Course.from_dict(row) for row in rows] for name, rows in semesters_data.items()}
+    return RunningTotals.from_semesters(parsed).cgpa()
+
+
+def test_decimal_tie_rounds_half_up():
+    rows = [("A", 0.5, 3.3), ("B", 1.5, 0.2), ("C", 2.5, 0.7), ("D", 3.5, 0.5), ("E", 2, 0.1)]
+    courses_list = [Course(*row) for row in rows]
+    assert exact_quotient({"S": [Course(*row).to_dict() for row in rows]}) == Fraction(565, 1000)
+    assert semester_totals(courses_list).gpa() == 0.57
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_baseline_formula(seed):
+    rng = random.Random(seed)
+    for _ in range(5000):
+        semesters_data = random_transcript(rng)
+        quotient = exact_quotient(semesters_data)
+        expected = baseline_cgpa(semesters_data)
+        if quotient is not None and (quotient * 100).denominator == 2 and 0 < quotient < 4:
+            # An exact .xx5 tie: the float loop can land either side of it,
+            # the engine always rounds the decimal value half-up
+            expected = float(Fraction(int(quotient * 100 + Fraction(1, 2)), 100))
+        assert engine_cgpa(semesters_data) == expected, semesters_data
+
+
+def test_totals_are_the_decimal_sums():
+    sem_totals = semester_totals([Course("A", 0.1, 3.3), Course("B", 0.2, 2.7), Course("", 5.0, 4.0)])
+    assert sem_totals.credits == 0.3
+    assert sem_totals.points == 0.87
+    assert sem_totals.listed_credits == 0.3
+    assert (sem_totals.valid_courses, sem_totals.courses) == (2, 2)
+
+
+def test_gpa_is_clamped_to_the_scale():
+    assert semester_totals([Course("A", 3.0, 4.5)]).gpa(4.0) == 4.0
+    assert semester_totals([Course("A", 3.0, 4.5)]).gpa(5.0) == 4.5
+    assert semester_totals([Course("A", 3.0, -1.0)]).gpa() == 0.0
+    assert semester_totals([Course("A", 0.0, 4.0), Course("", 3.0, 4.0)]).gpa() == 0.0
+
+
+def row_by_row(courses_list):
+    sem_totals = SemesterTotals()
+    for course in courses_list:
+        sem_totals.apply(course_contribution(course))
+    return sem_totals.as_delta()
+
+
+def random_rows(rng, size):
+    values = [None, 0.0, -1.0, 0.5, 1, 3.0, 3.3, 4.0, 2.35, 1e9, -1e9]
+    rows = [Course(rng.choice(["", "A"]), rng.choice(values), rng.choice(values)) for _ in range(size)]
+    # Legacy dict rows and rows that aren't courses at all
+    rows += [{"Course Name": "B", "Credit Hours": "3", "Grade Points": "x"}, None][:rng.randint(0, 2)]
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_columnar_pass_matches_row_by_row(seed):
+    rng = random.Random(seed)
+    semesters_data = {f"S{sem}": random_rows(rng, rng.randint(0, 120)) for sem in range(rng.randint(0, 5))}
+    semesters_data["not a semester"] = "x"
+    table = CourseTable.from_semesters(semesters_data)
+    assert table.semester_names == [name for name in semesters_data if name != "not a semester"]
+    assert [sem_totals.as_delta() for sem_totals in table.semester_totals()] == [
+        row_by_row(semesters_data[name]) for name in table.semester_names
+    ]
+    for name in table.semester_names:
+        assert semester_totals(semesters_data[name]).as_delta() == row_by_row(semesters_data[name])
+
+
+def test_columnar_pass_falls_back_before_int64_overflows():
+    courses_list = [Course("A", 1e9, 1e9)] * 100
+    (sem_totals,) = CourseTable.from_courses(courses_list).semester_totals()
+    assert sem_totals.as_delta() == row_by_row(courses_list)
+    assert sem_totals.points == 1e20
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def semester(*rows):
+    return [Course(*row) for row in rows]
+
+
+FALL = semester(("Math", 3.0, 4.0), ("Art", 2.0, 3.0))
+SPRING = semester(("Physics", 4.0, 3.3))
+SUMMER = semester(("Chem", 1.0, 2.0))
+
+
+def test_cache_entries_expire_on_lookup():
+    clock = FakeClock()
+    cache = SemesterCache(ttl=10, clock=clock)
+    cache.totals(FALL)
+    clock.now = 9.9
+    cache.totals(FALL)
+    assert (cache.hits, cache.misses, cache.expired) == (1, 1, 0)
+    # Expiry counts from the store, not from the last hit
+    clock.now = 10.0
+    assert cache.totals(FALL).as_delta() == semester_totals(FALL).as_delta()
+    assert (cache.hits, cache.misses, cache.expired) == (1, 2, 1)
+    assert cache.stats()["size"] == 1  # stored again by the miss
+
+
+def test_purge_drops_only_expired_entries():
+    clock = FakeClock()
+    cache = SemesterCache(ttl=10, clock=clock)
+    cache.totals(FALL)
+    clock.now = 5.0
+    cache.totals(SPRING)
+    clock.now = 12.0
+    assert cache.purge_expired() == 1
+    assert cache.stats()["size"] == 1
+    assert cache.rows == 1
+    assert cache.expired == 1
+    cache.totals(SPRING)
+    assert cache.hits == 1
+
+    forever = SemesterCache(ttl=None, clock=clock)
+    forever.totals(FALL)
+    clock.now = 1e9
+    assert forever.purge_expired() == 0
+    forever.totals(FALL)
+    assert forever.hits == 1
+
+
+def test_cache_evicts_least_recent_past_maxsize():
+    cache = SemesterCache(maxsize=2)
+    cache.totals(FALL)
+    cache.totals(SPRING)
+    cache.totals(FALL)  # SPRING is now least recent
+    cache.totals(SUMMER)
+    assert cache.stats()["size"] == 2
+    cache.totals(FALL)
+    cache.totals(SUMMER)
+    assert cache.hits == 3
+    cache.totals(SPRING)
+    assert cache.misses == 4
+
+
+def test_cache_evicts_past_max_rows():
+    cache = SemesterCache(max_rows=3)
+    cache.totals(FALL)     # 2 rows
+    cache.totals(SPRING)   # 3 rows
+    assert cache.rows == 3
+    cache.totals(SUMMER)   # 4 rows: FALL goes, though only 3 entries are held
+    assert cache.rows == 2
+    assert cache.stats()["size"] == 2
+    cache.totals(FALL)
+    assert cache.hits == 0
+
+
+def test_oversized_semester_is_computed_but_not_stored():
+    cache = SemesterCache(max_rows=2)
+    courses_list = semester(("A", 1.0, 1.0), ("B", 2.0, 2.0), ("C", 3.0, 3.0))
+    assert cache.totals(courses_list).as_delta() == semester_totals(courses_list).as_delta()
+    assert cache.stats()["size"] == 0
+    assert cache.rows == 0
+
+
+def test_renamed_and_reordered_semesters_share_an_entry():
+    cache = SemesterCache()
+    first = cache.totals(FALL)
+    second = cache.totals(semester(("Art History", 2.0, 3.0), ("Calculus", 3.0, 4.0)))
+    assert (cache.hits, cache.stats()["size"]) == (1, 1)
+    assert first.as_delta() == second.as_delta() == semester_totals(FALL).as_delta()
+    # Blank names don't count, so they key apart
+    cache.totals(semester(("", 2.0, 3.0), ("Calculus", 3.0, 4.0)))
+    assert cache.misses == 2
+    # Repeated rows key by count
+    cache.totals(FALL + FALL)
+    assert cache.misses == 3
+
+
+def test_cached_totals_are_fresh_objects():
+    cache = SemesterCache()
+    cache.totals(FALL).apply(course_contribution(Course("X", 4.0, 4.0)))
+    assert cache.totals(FALL).as_delta() == semester_totals(FALL).as_delta()
+
+
+def test_cache_bookkeeping_holds_under_threads():
+    cache = SemesterCache(maxsize=3)
+    semesters = [semester(("A", float(credits), 3.0)) for credits in range(1, 7)]
+    wrong = []  # an assert inside a thread wouldn't fail the test
+
+    def worker(offset):
+        for step in range(500):
+            courses_list = semesters[(offset + step) % len(semesters)]
+            if cache.totals(courses_list).as_delta() != semester_totals(courses_list).as_delta():
+                wrong.append(courses_list)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not wrong
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 500
+    assert stats["size"] <= 3
+    assert stats["rows"] == stats["size"]
+
+
+def test_totals_many_computes_misses_together():
+    cache = SemesterCache(max_rows=3)
+    cache.totals(SPRING)
+    big = semester(("A", 1.0, 1.0), ("B", 2.0, 2.0), ("C", 3.0, 3.0), ("D", 4.0, 4.0))
+    legacy = [{"Course Name": "D", "Credit Hours": "2", "Grade Points": ["unhashable"]}]
+    courses_lists = [FALL, SPRING, big, legacy, []]
+    results = cache.totals_many(courses_lists)
+    assert [sem_totals.as_delta() for sem_totals in results] == [
+        semester_totals(courses_list).as_delta() for courses_list in courses_lists
+    ]
+    assert (cache.hits, cache.misses) == (1, 5)
+    # FALL and the empty semester are kept; the oversized and unhashable ones aren't
+    assert cache.stats()["size"] == 3
+    cache.totals_many([FALL, []])
+    assert cache.hits == 3
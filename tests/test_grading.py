@@ -0,0 +1,34 @@
+import math
+
+import pytest
+
+from grading import DEFAULT_SCALE, SCALES, get_scale
+
+RAW = ["B+", "87%", "3.7", " b+ ", "120%", "-5%", "Z", ""]
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("4.0", [3.3, 3.3, 3.7, 3.3, None, None, None, None]),
+    ("4.3", [3.3, 3.3, 3.7, 3.3, None, None, None, None]),
+    ("5.0", [None, 5.0, 3.7, None, None, None, None, None]),
+    ("10", [7.0, 9.0, 3.7, 7.0, None, None, None, None]),
+    ("percent", [None, 87.0, 3.7, None, None, None, None, None]),
+])
+def test_to_points(key, expected):
+    points = SCALES[key].to_points(RAW).tolist()
+    assert [None if math.isnan(value) else value for value in points] == expected
+
+
+def test_band_edges():
+    scale = SCALES["4.3"]
+    assert scale.to_points(["97%", "96.9%", "93%", "0%", "100%"]).tolist() == [4.3, 4.0, 4.0, 0.0, 4.3]
+
+
+def test_numbers_pass_through_for_the_importer_to_range_check():
+    # normalize_chunk rejects these against max_points; to_points only converts
+    assert SCALES["4.0"].to_points(["5.5", "-1"]).tolist() == [5.5, -1.0]
+
+
+def test_unknown_scale_falls_back_to_default():
+    assert get_scale("7.0") is SCALES[DEFAULT_SCALE]
+    assert get_scale("10").max_points == 10.0
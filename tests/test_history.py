@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from gpa_engine import Course, RunningTotals
+from history import History
+
+
+def random_course(rng):
+    return Course(rng.choice(["", "Algebra", "Biology"]), rng.choice([None, 0.0, 1.5, 3.0]),
+                  rng.choice([None, 2.3, 3.7, 4.0]))
+
+
+def mutate(rng, history, semesters_data, totals):
+    """One app-style edit: checkpoint the touched semesters, then change data and totals"""
+    names = list(semesters_data)
+    filled = [name for name in names if semesters_data[name]]
+    op = rng.choice(["add_semester", "add_course"] + ["delete_semester", "edit_course", "delete_course"] * bool(filled))
+    if op == "add_semester":
+        sem_name = f"Semester {rng.randint(1, 8)}"
+        history.record(op, semesters_data, totals, [sem_name])
+        semesters_data[sem_name] = [random_course(rng) for _ in range(rng.randint(0, 3))]
+        totals.add_semester(sem_name, semesters_data[sem_name])
+        return
+    if op == "add_course":
+        sem_name = rng.choice(names or ["Semester 1"])
+        history.record(op, semesters_data, totals, [sem_name])
+        course = random_course(rng)
+        semesters_data.setdefault(sem_name, []).append(course)
+        totals.update_course(sem_name, None, course)
+        return
+    sem_name = rng.choice(filled)
+    history.record(op, semesters_data, totals, [sem_name])
+    if op == "delete_semester":
+        del semesters_data[sem_name]
+        totals.remove_semester(sem_name)
+        return
+    courses_list = semesters_data[sem_name]
+    index = rng.randrange(len(courses_list))
+    if op == "edit_course":
+        course = random_course(rng)
+        totals.update_course(sem_name, courses_list[index], course)
+        courses_list[index] = course
+    else:
+        totals.update_course(sem_name, courses_list.pop(index), None)
+
+
+def state(semesters_data, totals):
+    """Data in order plus every semester's exact totals"""
+    return (
+        [(name, list(courses_list)) for name, courses_list in semesters_data.items()],
+        {name: totals.semester(name).as_delta() for name in semesters_data},
+        totals.overall.as_delta(),
+    )
+
+
+def assert_consistent(semesters_data, totals):
+    rebuilt = RunningTotals.from_semesters(semesters_data)
+    assert state(semesters_data, totals) == state(semesters_data, rebuilt)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_undo_all_then_redo_all_round_trips(seed):
+    rng = random.Random(seed)
+    semesters_data = {"Semester 1": [Course("Physics", 3.0, 3.3)]}
+    totals = RunningTotals.from_semesters(semesters_data)
+    history = History(depth=100)
+    states = [state(semesters_data, totals)]
+    for _ in range(40):
+        mutate(rng, history, semesters_data, totals)
+        states.append(state(semesters_data, totals))
+
+    for expected in reversed(states[:-1]):
+        assert history.undo(semesters_data, totals) is not None
+        assert state(semesters_data, totals) == expected
+        assert_consistent(semesters_data, totals)
+    assert history.undo(semesters_data, totals) is None
+
+    for expected in states[1:]:
+        assert history.redo(semesters_data, totals) is not None
+        assert state(semesters_data, totals) == expected
+    assert history.redo(semesters_data, totals) is None
+    assert_consistent(semesters_data, totals)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_interleaved_undo_redo_and_edits(seed):
+    rng = random.Random(seed)
+    semesters_data, totals, history = {}, RunningTotals(), History(depth=100)
+    # states[position] is what undo/redo should land on; a new edit drops the redo tail
+    states, position = [state(semesters_data, totals)], 0
+    for _ in range(120):
+        roll = rng.random()
+        if roll < 0.25 and position > 0:
+            history.undo(semesters_data, totals)
+            position -= 1
+        elif roll < 0.4 and position < len(states) - 1:
+            history.redo(semesters_data, totals)
+            position += 1
+        else:
+            mutate(rng, history, semesters_data, totals)
+            del states[position + 1:]
+            states.append(state(semesters_data, totals))
+            position += 1
+        assert state(semesters_data, totals) == states[position]
+    assert_consistent(semesters_data, totals)
@@ -0,0 +1,160 @@
+import random
+import sqlite3
+
+import pytest
+
+from gpa_engine import Course
+from storage import TranscriptStore, apply_event
+
+# Long enough that the writer thread never flushes on its own mid-test
+IDLE = 3600
+
+
+def make_store(path, **kwargs):
+    kwargs.setdefault("flush_interval", IDLE)
+    return TranscriptStore(str(path), **kwargs)
+
+
+def random_course(rng):
+    return Course(
+        rng.choice(["", "Calculus", "Physics", "History"]),
+        rng.choice([None, 0.0, 1.0, 2.5, 3.0, 4.0]),
+        rng.choice([None, 0.0, 1.7, 3.3, 4.0]),
+    )
+
+
+def random_event(rng, semesters_data):
+    """An edit that is valid against semesters_data, as the app would log it"""
+    names = list(semesters_data)
+    filled = [name for name in names if semesters_data[name]]
+    choices = ["set_semester", "add_courses"] + ["delete_semester"] * bool(names)
+    if filled:
+        choices += ["edit_course", "delete_course", "restore"]
+    if rng.random() < 0.02:
+        choices = ["reset"]
+    op = rng.choice(choices)
+    if op == "set_semester":
+        return {"op": op, "semester": f"Semester {rng.randint(1, 6)}",
+                "courses": [random_course(rng) for _ in range(rng.randint(0, 4))]}
+    if op == "add_courses":
+        return {"op": op, "semester": rng.choice(names + ["Semester 7"]),
+                "courses": [random_course(rng) for _ in range(rng.randint(1, 3))]}
+    if op == "delete_semester":
+        return {"op": op, "semester": rng.choice(names)}
+    if op == "reset":
+        return {"op": op}
+    sem_name = rng.choice(filled)
+    index = rng.randrange(len(semesters_data[sem_name]))
+    if op == "edit_course":
+        return {"op": op, "semester": sem_name, "index": index, "course": random_course(rng)}
+    if op == "delete_course":
+        return {"op": op, "semester": sem_name, "index": index}
+    order = names[:]
+    rng.shuffle(order)
+    return {"op": op, "order": order, "semesters": {sem_name: [random_course(rng)]}}
+
+
+def edit(store, transcript_id, semesters_data, event):
+    """Apply an event to the in-memory model and log it, as persist() does"""
+    fields = {key: value for key, value in event.items() if key != "op"}
+    apply_event(semesters_data, event)
+    store.append(transcript_id, event["op"], **fields)
+
+
+def snapshot_seq(path, transcript_id):
+    with sqlite3.connect(str(path)) as conn:
+        row = conn.execute(
+            "SELECT snapshot_seq FROM transcripts WHERE transcript_id = ?", (transcript_id,)
+        ).fetchone()
+    return row[0] if row else 0
+
+
+@pytest.mark.parametrize("snapshot_every", [1000, 7])
+@pytest.mark.parametrize("seed", range(5))
+def test_load_matches_live_state(tmp_path, seed, snapshot_every):
+    rng = random.Random(seed)
+    path = tmp_path / "store.sqlite3"
+    store = make_store(path, snapshot_every=snapshot_every)
+    live = {}
+    for _ in range(300):
+        edit(store, "t1", live, random_event(rng, live))
+        if rng.random() < 0.1:
+            store.flush()
+        if rng.random() < 0.1:
+            # Flushed and queued events alike
+            assert store.load("t1") == live
+    store.close()
+
+    reopened = make_store(path, snapshot_every=snapshot_every)
+    assert reopened.load("t1") == live
+    assert [event["seq"] for event in reopened.events("t1")] == list(range(1, 301))
+    if snapshot_every < 300:
+        assert snapshot_seq(path, "t1") > 0
+    else:
+        assert snapshot_seq(path, "t1") == 0
+    reopened.close()
+
+
+def test_load_after_snapshot_replays_only_later_events(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = make_store(path, snapshot_every=3)
+    live = {}
+    for number in range(1, 5):
+        edit(store, "t1", live, {"op": "add_courses", "semester": "Semester 1",
+                                 "courses": [Course(f"Course {number}", 3.0, 4.0)]})
+    store.flush()
+    assert snapshot_seq(path, "t1") == 4
+    edit(store, "t1", live, {"op": "delete_course", "semester": "Semester 1", "index": 0})
+    store.flush()
+    assert snapshot_seq(path, "t1") == 4
+    store.close()
+    assert make_store(path).load("t1") == live
+
+
+def test_stores_sharing_a_file_do_not_collide(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    first, second = make_store(path), make_store(path)
+    first.append("t1", "add_courses", semester="S1", courses=[Course("A", 3.0, 4.0)])
+    second.append("t1", "add_courses", semester="S2", courses=[Course("B", 2.0, 3.0)])
+    first.append("t1", "add_courses", semester="S1", courses=[Course("C", 1.0, 2.0)])
+    first.flush()
+    second.flush()
+    second.append("t1", "add_courses", semester="S1", courses=[Course("D", 4.0, 1.0)])
+    second.flush()
+
+    assert [event["seq"] for event in first.events("t1")] == [1, 2, 3, 4]
+    assert first.load("t1") == {
+        "S1": [Course("A", 3.0, 4.0), Course("C", 1.0, 2.0), Course("D", 4.0, 1.0)],
+        "S2": [Course("B", 2.0, 3.0)],
+    }
+    first.close()
+    second.close()
+
+
+def test_failed_batch_is_kept_and_retried(tmp_path, monkeypatch):
+    path = tmp_path / "store.sqlite3"
+    store = make_store(path)
+    live = {}
+    edit(store, "t1", live, {"op": "set_semester", "semester": "S1", "courses": [Course("A", 3.0, 4.0)]})
+
+    write_batch = store._write_batch
+
+    def failing(batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(store, "_write_batch", failing)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    assert store.write_error == "OperationalError: disk I/O error"
+    assert store.unsaved == 1
+    assert store.load("t1") == live
+
+    edit(store, "t1", live, {"op": "edit_course", "semester": "S1", "index": 0,
+                             "course": Course("A", 3.0, 2.0)})
+    monkeypatch.setattr(store, "_write_batch", write_batch)
+    assert store.flush() == 1
+    assert store.write_error is None
+    assert store.unsaved == 0
+    assert [event["op"] for event in store.events("t1")] == ["set_semester", "edit_course"]
+    store.close()
+    assert make_store(path).load("t1") == live
@@ -0,0 +1,50 @@
+import io
+
+import pandas as pd
+
+from gpa_engine import Course
+from grading import SCALES
+from transcript_import import DEFAULT_SEMESTER, import_transcript, normalize_chunk
+
+HEADER = "Semester,Course Name,Credit Hours,Grade Points\n"
+
+
+def chunk(rows):
+    return pd.DataFrame(rows, columns=["Semester", "Course Name", "Credit Hours", "Grade Points"], dtype=str)
+
+
+def test_normalize_chunk_applies_the_course_rules():
+    clean = normalize_chunk(chunk([
+        ["Fall", " Physics ", "3", "3.7"],
+        ["Fall", "  ", "3", "4"],          # blank name
+        ["Fall", "Art", "x", "4"],         # credits aren't a number
+        ["Fall", "Lab", "12", "4"],        # over the 10 credit hour input limit
+        ["Fall", "Gym", "0", "4"],         # no credits
+        ["", "Seminar", "1.5", ""],        # blank grade counts as 0; blank semester gets the default
+        ["Fall", "Music", "2", "B+"],
+        ["Fall", "Drama", "2", "4.5"],     # over the scale's max
+    ]))
+    assert list(clean.itertuples(index=False, name=None)) == [
+        ("Fall", "Physics", 3.0, 3.7),
+        (DEFAULT_SEMESTER, "Seminar", 1.5, 0.0),
+        ("Fall", "Music", 2.0, 3.3),
+    ]
+
+
+def test_normalize_chunk_uses_the_scale():
+    clean = normalize_chunk(chunk([["Fall", "Physics", "3", "87%"], ["Fall", "Art", "3", "9.5"]]), SCALES["10"])
+    assert clean["Grade Points"].tolist() == [9.0, 9.5]
+
+
+def test_import_bom_csv_across_chunks():
+    rows = "".join(f"Fall,Course {i},3,B+\n" for i in range(7)) + "Spring,Physics,4,87%\nSpring,,3,4\n"
+    file = io.BytesIO((HEADER + rows).encode("utf-8-sig"))
+    fractions = []
+    existing = {"Fall": [Course("Old", 1.0, 2.0)]}
+    semesters_data, stats = import_transcript(file, "csv", existing, chunk_size=3, progress=fractions.append)
+
+    assert semesters_data is existing
+    assert [course.name for course in semesters_data["Fall"]] == ["Old"] + [f"Course {i}" for i in range(7)]
+    assert semesters_data["Spring"] == [Course("Physics", 4.0, 3.3)]
+    assert (stats.rows, stats.imported, stats.skipped) == (9, 8, 1)
+    assert len(fractions) == 4 and fractions[-1] == 1.0
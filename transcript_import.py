@@ -0,0 +1,166 @@
+"""Chunked transcript import from CSV or Excel files.
+
+Files are read a chunk of rows at a time (pandas ``chunksize`` for CSV,
+openpyxl's read-only row iterator for Excel), each chunk is validated with
+the same rules calculate_gpa applies, and the surviving rows are appended
+to a semesters_data dict as Course records. Only one chunk of raw rows
+is in memory at once. Grades may be points, letters or percentages; the
+grading scale converts each chunk's grade column in one vectorized pass.
+"""
+import pandas as pd
+
+from gpa_engine import Course
+from grading import DEFAULT_SCALE, get_scale
+
+COLUMNS = ("Semester", "Course Name", "Credit Hours", "Grade Points")
+DEFAULT_SEMESTER = "Imported"
+CHUNK_SIZE = 5000
+MAX_CREDIT_HOURS = 10.0  # the course inputs' max_value
+
+
+class ImportStats:
+    """Row counts reported back to the UI"""
+
+    __slots__ = ("rows", "imported", "skipped")
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0
+
+# ============================================================================
+# READERS - yield DataFrames of at most chunk_size rows
+# ============================================================================
+
+def _canonical_columns(columns):
+    """Map header spellings ("credit hours", " Grade Points ") onto COLUMNS"""
+    lookup = {name.lower(): name for name in COLUMNS}
+    return [lookup.get(str(column).strip().lower(), column) for column in columns]
+
+
+def iter_csv_chunks(file, chunk_size=CHUNK_SIZE):
+    for chunk in pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        chunk.columns = _canonical_columns(chunk.columns)
+        yield chunk
+
+
+def iter_excel_chunks(file, chunk_size=CHUNK_SIZE, on_total_rows=None):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportError("Excel import needs openpyxl: pip install openpyxl") from exc
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        if on_total_rows is not None and sheet.max_row:
+            on_total_rows(sheet.max_row - 1)
+        rows = sheet.iter_rows(values_only=True)
+        header = _canonical_columns(next(rows, ()))
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+# ============================================================================
+# VALIDATION - calculate_gpa's rules, applied to a whole chunk at once
+# ============================================================================
+
+def normalize_chunk(chunk, scale=None):
+    """Return a clean DataFrame with COLUMNS; invalid rows are dropped.
+
+    A row survives if its course name is non-empty after stripping, its
+    credit hours are numeric and > 0, and its grade converts to points on
+    `scale` (blank grades count as 0, as in calculate_gpa). Values outside
+    the course inputs' ranges are rejected too, since the widgets can't hold them.
+    """
+    scale = scale or get_scale(DEFAULT_SCALE)
+    n = len(chunk)
+    empty = pd.Series([""] * n, index=chunk.index)
+
+    names = chunk.get("Course Name", empty).fillna("").astype(str).str.strip()
+    semesters = chunk.get("Semester", empty).fillna("").astype(str).str.strip()
+    credits = pd.to_numeric(chunk.get("Credit Hours", empty), errors="coerce")
+    grades_raw = chunk.get("Grade Points", empty)
+    grades_blank = grades_raw.isna() | (grades_raw.astype(str).str.strip() == "")
+    grades = pd.Series(scale.to_points(grades_raw.where(~grades_blank, 0)), index=chunk.index)
+
+    valid = (
+        (names != "")
+        & (credits > 0) & (credits <= MAX_CREDIT_HOURS)
+        & (grades >= 0) & (grades <= scale.max_points)
+    )
+    return pd.DataFrame({
+        "Semester": semesters[valid].where(semesters[valid] != "", DEFAULT_SEMESTER),
+        "Course Name": names[valid],
+        "Credit Hours": credits[valid].astype(float),
+        "Grade Points": grades[valid].astype(float),
+    })
+
+# ============================================================================
+# IMPORT DRIVER
+# ============================================================================
+
+def import_transcript(file, kind, semesters_data=None, chunk_size=CHUNK_SIZE, progress=None, scale=None):
+    """Stream `file` into semesters_data (new dict if None).
+
+    `kind` is "csv" or "xlsx"; grades convert on `scale` (default 4.0).
+    `progress(fraction)` is called after every chunk. Courses for an
+    existing semester name are appended to it. Returns (semesters_data,
+    ImportStats).
+    """
+    if semesters_data is None:
+        semesters_data = {}
+    stats = ImportStats()
+
+    # CSV progress follows the byte offset; Excel's zip stream doesn't, so
+    # it follows rows against the sheet's declared dimensions instead
+    total_bytes = _size_of(file)
+    total_rows = []
+    if kind == "xlsx":
+        chunks = iter_excel_chunks(file, chunk_size, on_total_rows=total_rows.append)
+    else:
+        chunks = iter_csv_chunks(file, chunk_size)
+    for chunk in chunks:
+        clean = normalize_chunk(chunk, scale)
+        stats.rows += len(chunk)
+        stats.imported += len(clean)
+        stats.skipped += len(chunk) - len(clean)
+
+        # normalize_chunk already stripped and validated every field
+        for sem_name, name, credit_hours, grade_points in clean.itertuples(index=False, name=None):
+            semesters_data.setdefault(sem_name, []).append(Course(name, credit_hours, grade_points))
+
+        if progress is not None:
+            if total_rows and total_rows[0] > 0:
+                progress(min(stats.rows / total_rows[0], 1.0))
+            else:
+                progress(_fraction_read(file, total_bytes))
+
+    if progress is not None:
+        progress(1.0)
+    return semesters_data, stats
+
+
+def _size_of(file):
+    size = getattr(file, "size", None)
+    if size is None and hasattr(file, "seek"):
+        position = file.tell()
+        size = file.seek(0, 2)
+        file.seek(position)
+    return size or 0
+
+
+def _fraction_read(file, total_bytes):
+    if not total_bytes or not hasattr(file, "tell"):
+        return 0.0
+    try:
+        return min(file.tell() / total_bytes, 1.0)
+    except (OSError, ValueError):
+        return 0.0
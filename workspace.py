@@ -0,0 +1,68 @@
+"""Advisor workspaces: many students per session, few of them in memory.
+
+A workspace is a list of students in the store's students index, each with
+a transcript of their own. Listing the workspace reads only index rows; a
+transcript is loaded when its student is opened, and only the `capacity`
+most recently opened students keep their session state in memory. Every
+edit is in the event log before a student can be evicted, so eviction
+costs a reload on the next open and that student's undo history, nothing
+else.
+"""
+import collections
+import uuid
+
+WORKING_SET_SIZE = 8
+
+
+class Workspace:
+    """One workspace's student index plus an LRU working set of open students"""
+
+    def __init__(self, store, workspace_id, capacity=WORKING_SET_SIZE):
+        self.store = store
+        self.workspace_id = workspace_id
+        self.capacity = capacity
+        self.students = {record.transcript_id: record for record in store.students(workspace_id)}
+        self._working_set = collections.OrderedDict()  # {transcript_id: state}, oldest first
+
+    def __contains__(self, transcript_id):
+        return transcript_id in self.students
+
+    def __len__(self):
+        return len(self.students)
+
+    @property
+    def loaded(self):
+        """Transcript ids held in memory, least recently used first"""
+        return list(self._working_set)
+
+    def add(self, name, transcript_id=None):
+        """Index a student; a new transcript id is made unless one is given"""
+        record = self.store.add_student(self.workspace_id, transcript_id or uuid.uuid4().hex, name)
+        self.students[record.transcript_id] = record
+        return record
+
+    def rename(self, transcript_id, name):
+        self.store.rename_student(self.workspace_id, transcript_id, name)
+        self.students[transcript_id] = self.students[transcript_id]._replace(name=name)
+
+    def open(self, transcript_id, build_state):
+        """The student's state, most recent now; a miss loads the transcript.
+
+        build_state(transcript_id, semesters_data) makes the state for a
+        transcript that isn't in memory.
+        """
+        state = self._working_set.pop(transcript_id, None)
+        if state is None:
+            state = build_state(transcript_id, self.store.load(transcript_id))
+        self._keep(transcript_id, state)
+        return state
+
+    def stash(self, transcript_id, state):
+        """Keep the live state of the student being left (its objects may have been replaced)"""
+        self._working_set.pop(transcript_id, None)
+        self._keep(transcript_id, state)
+
+    def _keep(self, transcript_id, state):
+        self._working_set[transcript_id] = state
+        while len(self._working_set) > self.capacity:
+            self._working_set.popitem(last=False)